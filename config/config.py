@@ -1,9 +1,6 @@
+from functools import cache
 from pathlib import Path
 import os
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
 
 # Base directory
 BASE_DIR = Path(__file__).parent.parent
@@ -31,9 +28,28 @@ TECHNICAL_PARAMS = {
     "atr_period": 14
 }
 
+
 # API Configuration
-API_CONFIG = {
-    "alpha_vantage_key": os.getenv("ALPHA_VANTAGE_API_KEY"),
-    "request_timeout": 30,
-    "max_retries": 3
-}
+@cache
+def get_api_config():
+    """
+    Build the API settings on first use.
+
+    The .env file is only read here, so importing this module for the
+    static settings above has no environment side effects.
+    """
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    return {
+        "alpha_vantage_key": os.getenv("ALPHA_VANTAGE_API_KEY"),
+        "request_timeout": 30,
+        "max_retries": 3
+    }
+
+
+def __getattr__(name):
+    # Keep `from config.config import API_CONFIG` working, lazily.
+    if name == "API_CONFIG":
+        return get_api_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -8,167 +8,143 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-import pandas as pd
 import numpy as np
+from collections import namedtuple
 from pathlib import Path
-import ta
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 
+from src.analysis import kernels
+from src.data.loader import read_ohlcv_csv
+from src.strategy.aggressive_kernel import LOOP_DTYPE, aggressive_loop, warm_up
+from src.utils.soa import to_soa
 
-def aggressive_backtest(data, risk_pct=0.05, atr_sl=1.0, atr_tp=2.0):
+# Entry signals: EMA 3/8 crossover, MACD crossover, fast-RSI reversal
+SIGNALS = ('ema', 'macd', 'rsi')
+
+# Outcome of one challenge window. Fields that do not apply to how the
+# window ended (e.g. days when the drawdown limit was hit) are None.
+BacktestResult = namedtuple('BacktestResult',
+                            'passed failed reason profit trades days win_rate')
+
+
+def compute_indicators(data, signals=SIGNALS):
     """
-    Ultra-aggressive strategy for prop firm.
-    Higher risk, tighter stops, multiple signals.
+    Compute the strategy's indicators once over the whole series.
+    
+    Only the indicators needed by ``signals`` are built. Returns a dict
+    of ``LOOP_DTYPE`` arrays (OHLC, ATR plus signal indicators) that
+    windows can be sliced from without recomputing anything. Indicators
+    are computed in float64 and only narrowed for storage.
     """
+    arrays = to_soa(data, ['close', 'high', 'low'], dtype=np.float64)
+    close = arrays['close']
     
-    df = data.copy()
+    # Plain array kernels instead of the ta wrappers (same values, no
+    # per-call Series construction and validation).
+    arrays['atr'] = kernels.atr(arrays['high'], arrays['low'], close, 10)
     
-    # Fast indicators
-    df['ema_3'] = ta.trend.ema_indicator(df['close'], window=3)
-    df['ema_8'] = ta.trend.ema_indicator(df['close'], window=8)
-    df['ema_21'] = ta.trend.ema_indicator(df['close'], window=21)
-    df['rsi'] = ta.momentum.rsi(df['close'], window=5)  # Fast RSI
-    df['atr'] = ta.volatility.average_true_range(df['high'], df['low'], df['close'], window=10)
+    if 'ema' in signals:
+        arrays['ema_3'] = kernels.ema(close, 3)
+        arrays['ema_8'] = kernels.ema(close, 8)
     
-    # MACD
-    macd = ta.trend.MACD(df['close'])
-    df['macd'] = macd.macd()
-    df['macd_sig'] = macd.macd_signal()
+    if 'macd' in signals:
+        arrays['macd'], arrays['macd_sig'] = kernels.macd(close)
     
-    capital = 10000
-    start = capital
-    highest = capital
-    position = 0
-    entry = 0
-    sl = 0
-    tp = 0
-    trail = 0
+    if 'rsi' in signals:
+        arrays['rsi'] = kernels.rsi(close, 5)  # Fast RSI
     
-    trades = []
+    return {name: values.astype(LOOP_DTYPE) for name, values in arrays.items()}
+
+
+def aggressive_backtest_arrays(indicators, start, end, risk_pct=0.05, atr_sl=1.0, atr_tp=2.0,
+                               signals=SIGNALS):
+    """
+    Run the challenge on bars [start, end) of precomputed indicator arrays.
     
-    for i in range(25, min(55, len(df))):  # 30 day window
-        close = df['close'].iloc[i]
-        high = df['high'].iloc[i]
-        low = df['low'].iloc[i]
-        atr = df['atr'].iloc[i] if not pd.isna(df['atr'].iloc[i]) else close * 0.01
-        
-        # Manage position
-        if position > 0:
-            # Trailing stop
-            if high > entry + atr:
-                trail = max(trail, high - atr * 0.5)
-            eff_sl = max(sl, trail)
-            
-            if low <= eff_sl:
-                pnl = (eff_sl - entry) * position
-                capital += pnl
-                trades.append(pnl)
-                position = 0
-            elif high >= tp:
-                pnl = (tp - entry) * position
-                capital += pnl
-                trades.append(pnl)
-                position = 0
-        
-        elif position < 0:
-            if low < entry - atr:
-                trail = min(trail if trail > 0 else 99999, low + atr * 0.5)
-            eff_sl = min(sl, trail) if trail > 0 else sl
-            
-            if high >= eff_sl:
-                pnl = (entry - eff_sl) * abs(position)
-                capital += pnl
-                trades.append(pnl)
-                position = 0
-            elif low <= tp:
-                pnl = (entry - tp) * abs(position)
-                capital += pnl
-                trades.append(pnl)
-                position = 0
-        
-        # New entry - multiple signal types
-        if position == 0:
-            ema3 = df['ema_3'].iloc[i]
-            ema8 = df['ema_8'].iloc[i]
-            ema21 = df['ema_21'].iloc[i]
-            rsi = df['rsi'].iloc[i]
-            macd_val = df['macd'].iloc[i]
-            macd_sig_val = df['macd_sig'].iloc[i]
-            
-            prev_ema3 = df['ema_3'].iloc[i-1]
-            prev_ema8 = df['ema_8'].iloc[i-1]
-            prev_macd = df['macd'].iloc[i-1]
-            prev_macd_sig = df['macd_sig'].iloc[i-1]
-            
-            long = False
-            short = False
-            
-            # Signal 1: EMA crossover
-            if ema3 > ema8 and prev_ema3 <= prev_ema8:
-                long = True
-            elif ema3 < ema8 and prev_ema3 >= prev_ema8:
-                short = True
-            
-            # Signal 2: MACD crossover
-            if macd_val > macd_sig_val and prev_macd <= prev_macd_sig:
-                long = True
-            elif macd_val < macd_sig_val and prev_macd >= prev_macd_sig:
-                short = True
-            
-            # Signal 3: RSI extremes with reversal
-            if rsi < 20 and close > df['close'].iloc[i-1]:
-                long = True
-            elif rsi > 80 and close < df['close'].iloc[i-1]:
-                short = True
-            
-            if long:
-                sl = close - atr * atr_sl
-                tp = close + atr * atr_tp
-                risk = close - sl
-                size = (capital * risk_pct) / risk
-                position = size
-                entry = close
-                trail = 0
-            
-            elif short:
-                sl = close + atr * atr_sl
-                tp = close - atr * atr_tp
-                risk = sl - close
-                size = (capital * risk_pct) / risk
-                position = -size
-                entry = close
-                trail = 99999
-        
-        highest = max(highest, capital)
-        
-        # Check drawdown limit
-        if highest - capital > start * 0.10:
-            return {'passed': False, 'failed': True, 'reason': 'DD', 
-                    'profit': (capital - start) / start * 100, 'trades': len(trades)}
+    Slicing gives views, so windows share the one indicator pass.
+    ``signals`` picks which entry signals are active; their indicators
+    must be present in ``indicators``. Returns a ``BacktestResult``.
+    """
+    w = slice(start, end)
+    empty = np.empty(0, dtype=LOOP_DTYPE)
+    start_capital = 10000.0
+    capital, status, n_trades, n_wins, days = aggressive_loop(
+        indicators['close'][w], indicators['high'][w], indicators['low'][w],
+        indicators.get('ema_3', empty)[w], indicators.get('ema_8', empty)[w],
+        indicators.get('rsi', empty)[w],
+        indicators.get('macd', empty)[w], indicators.get('macd_sig', empty)[w],
+        indicators['atr'][w],
+        risk_pct, atr_sl, atr_tp, start_capital,
+        'ema' in signals, 'macd' in signals, 'rsi' in signals
+    )
+    profit = (capital - start_capital) / start_capital * 100
+    
+    if status == 1:
+        return BacktestResult(False, True, 'DD', profit, n_trades, None, None)
+    
+    if status == 2:
+        return BacktestResult(True, False, None, profit, n_trades, days, None)
+    
+    passed = capital >= start_capital * 1.10
+    return BacktestResult(passed, False, None if passed else 'TIME', profit, n_trades, None,
+                          n_wins / n_trades * 100 if n_trades else 0)
+
+
+def aggressive_backtest(data, risk_pct=0.05, atr_sl=1.0, atr_tp=2.0, signals=SIGNALS):
+    """
+    Ultra-aggressive strategy for prop firm.
+    Higher risk, tighter stops, multiple signals.
+    """
+    return aggressive_backtest_arrays(compute_indicators(data, signals), 0, len(data),
+                                      risk_pct=risk_pct, atr_sl=atr_sl, atr_tp=atr_tp,
+                                      signals=signals)
+
+
+def evaluate_combo(indicators, risk, sl, tp, starts, signals=SIGNALS):
+    """
+    Run the 60-bar challenge window from every start for one parameter set.
+    
+    Returns (risk, sl, tp, pass_rate, avg_profit); the last two are None
+    when no window was long enough to test.
+    """
+    n = len(indicators['close'])
+    results = []
+    
+    for start in starts:
+        end = min(start + 60, n)
+        if end - start < 55:
+            continue
         
-        # Check if passed
-        if capital >= start * 1.10:
-            return {'passed': True, 'failed': False, 'reason': None,
-                    'profit': (capital - start) / start * 100, 'trades': len(trades),
-                    'days': i - 25 + 1}
+        results.append(aggressive_backtest_arrays(indicators, start, end,
+                                                  risk_pct=risk, atr_sl=sl, atr_tp=tp,
+                                                  signals=signals))
     
-    # Close position at end
-    if position != 0:
-        close = df['close'].iloc[min(54, len(df)-1)]
-        if position > 0:
-            pnl = (close - entry) * position
-        else:
-            pnl = (entry - close) * abs(position)
-        capital += pnl
-        trades.append(pnl)
+    if not results:
+        return risk, sl, tp, None, None
     
-    return {'passed': capital >= start * 1.10, 'failed': False,
-            'reason': 'TIME' if capital < start * 1.10 else None,
-            'profit': (capital - start) / start * 100, 'trades': len(trades),
-            'win_rate': len([t for t in trades if t > 0]) / len(trades) * 100 if trades else 0}
+    passed = sum(1 for r in results if r.passed)
+    pass_rate = passed / len(results) * 100
+    avg_profit = np.mean([r.profit for r in results])
+    return risk, sl, tp, pass_rate, avg_profit
+
+
+# Indicator arrays shipped to each grid-search worker once, at start-up,
+# instead of being pickled again with every parameter combination.
+_worker_indicators = None
+
+
+def _init_worker(indicators):
+    global _worker_indicators
+    _worker_indicators = indicators
+
+
+def _evaluate_cached(risk, sl, tp, starts):
+    return evaluate_combo(_worker_indicators, risk, sl, tp, starts)
 
 
 def main():
-    data = pd.read_csv(Path("data") / "XAU_USD_1D_sample.csv", index_col=0, parse_dates=True)
+    data = read_ohlcv_csv(Path("data") / "XAU_USD_1D_sample.csv")
     
     print("=" * 70)
     print("🔥 AGGRESSIVE PROP FIRM OPTIMIZATION")
@@ -179,31 +155,40 @@ def main():
     print(f"{'Risk%':>6} {'SL':>5} {'TP':>5} {'Pass%':>8} {'AvgProfit':>10}")
     print("-" * 45)
     
+    # Indicators only depend on prices, so compute them once for the whole
+    # series and let every window slice into them.
+    indicators = compute_indicators(data)
+    
     best_params = None
     best_pass_rate = 0
     
-    for risk in [0.04, 0.05, 0.06, 0.08]:
-        for sl in [0.8, 1.0, 1.2]:
-            for tp in [1.5, 2.0, 2.5, 3.0]:
-                results = []
-                
-                for start in range(80, len(data) - 60, 15):
-                    window = data.iloc[start:start+60]
-                    if len(window) < 55:
-                        continue
-                    
-                    result = aggressive_backtest(window, risk_pct=risk, atr_sl=sl, atr_tp=tp)
-                    results.append(result)
-                
-                if results:
-                    passed = len([r for r in results if r['passed']])
-                    pass_rate = passed / len(results) * 100
-                    avg_profit = np.mean([r['profit'] for r in results])
-                    
-                    if pass_rate > best_pass_rate:
-                        best_pass_rate = pass_rate
-                        best_params = (risk, sl, tp)
-                        print(f"{risk*100:>6.0f} {sl:>5.1f} {tp:>5.1f} {pass_rate:>8.1f} {avg_profit:>+10.2f} *** NEW BEST")
+    # Every combination is independent, so fan them out across processes
+    # and reduce in grid order afterwards.
+    jobs = [(risk, sl, tp)
+            for risk in [0.04, 0.05, 0.06, 0.08]
+            for sl in [0.8, 1.0, 1.2]
+            for tp in [1.5, 2.0, 2.5, 3.0]]
+    risks, sls, tps = zip(*jobs)
+    starts = list(range(80, len(data) - 60, 15))
+    
+    # Compile the bar loop here, before the pool starts: forked workers
+    # inherit the compiled function and spawned ones hit the on-disk cache,
+    # so no worker pays the JIT cost again.
+    warm_up()
+    
+    with ProcessPoolExecutor(initializer=_init_worker, initargs=(indicators,)) as executor:
+        combo_results = list(executor.map(
+            _evaluate_cached, risks, sls, tps, repeat(starts)
+        ))
+    
+    for risk, sl, tp, pass_rate, avg_profit in combo_results:
+        if pass_rate is None:
+            continue
+        
+        if pass_rate > best_pass_rate:
+            best_pass_rate = pass_rate
+            best_params = (risk, sl, tp)
+            print(f"{risk*100:>6.0f} {sl:>5.1f} {tp:>5.1f} {pass_rate:>8.1f} {avg_profit:>+10.2f} *** NEW BEST")
     
     print("-" * 45)
     
@@ -212,30 +197,36 @@ def main():
         print(f"\nBest: Risk={risk*100:.0f}%, SL={sl:.1f}×ATR, TP={tp:.1f}×ATR")
         print(f"Pass Rate: {best_pass_rate:.1f}%")
         
-        # Full test with best params
-        print("\n" + "=" * 70)
-        print("FULL TEST WITH BEST PARAMETERS")
-        print("=" * 70)
-        print(f"{'Start':<12} {'Profit%':>10} {'Trades':>8} {'Status'}")
-        print("-" * 50)
-        
+        # Full test with best params: run every window first, report after,
+        # so the backtests are not interleaved with terminal I/O.
         all_results = []
+        run_starts = []
         for start in range(80, len(data) - 60, 10):
-            window = data.iloc[start:start+60]
-            if len(window) < 55:
+            end = min(start + 60, len(data))
+            if end - start < 55:
                 continue
             
-            result = aggressive_backtest(window, risk_pct=risk, atr_sl=sl, atr_tp=tp)
-            result['date'] = data.index[start].strftime('%Y-%m-%d')
+            result = aggressive_backtest_arrays(indicators, start, end,
+                                                risk_pct=risk, atr_sl=sl, atr_tp=tp)
             all_results.append(result)
-            
-            status = "✅ PASS" if result['passed'] else ("❌ FAIL" if result['failed'] else "⏳ TIME")
-            print(f"{result['date']:<12} {result['profit']:>+10.2f} {result['trades']:>8} {status}")
+            run_starts.append(start)
         
-        print("-" * 50)
+        lines = [
+            "\n" + "=" * 70,
+            "FULL TEST WITH BEST PARAMETERS",
+            "=" * 70,
+            f"{'Start':<12} {'Profit%':>10} {'Trades':>8} {'Status'}",
+            "-" * 50,
+        ]
+        for start, result in zip(run_starts, all_results):
+            date = data.index[start].strftime('%Y-%m-%d')
+            status = "✅ PASS" if result.passed else ("❌ FAIL" if result.failed else "⏳ TIME")
+            lines.append(f"{date:<12} {result.profit:>+10.2f} {result.trades:>8} {status}")
+        lines.append("-" * 50)
+        print("\n".join(lines))
         
-        passed = len([r for r in all_results if r['passed']])
-        failed = len([r for r in all_results if r['failed']])
+        passed = sum(1 for r in all_results if r.passed)
+        failed = sum(1 for r in all_results if r.failed)
         total = len(all_results)
         final_pass_rate = passed / total * 100
         
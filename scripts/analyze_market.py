@@ -4,15 +4,30 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-import pandas as pd
 import numpy as np
 from pathlib import Path
 import ta
 
+from src.data.loader import read_ohlcv_csv
+from src.utils.soa import to_soa
+
+
+def streak_lengths(mask):
+    """
+    Length of the current run of True values at each position of a bool array.
+    
+    The running count resets to zero on every False, e.g.
+    [T, T, F, T] -> [1, 2, 0, 1].
+    """
+    counts = np.cumsum(mask)
+    # Count reached at the most recent False, carried forward
+    resets = np.maximum.accumulate(np.where(mask, 0, counts))
+    return counts - resets
+
 
 def main():
     data_path = Path("data") / "XAU_USD_1D_sample.csv"
-    data = pd.read_csv(data_path, index_col=0, parse_dates=True)
+    data = read_ohlcv_csv(data_path)
     
     print("=" * 70)
     print("MARKET ANALYSIS")
@@ -49,7 +64,8 @@ def main():
     data['ema_50'] = ta.trend.ema_indicator(data['close'], window=50)
     
     # Find major peaks and troughs
-    # Simple approach: local max/min over 20 bars
+    # Simple approach: local max/min over 20 bars. Rolling max/min use
+    # pandas' O(N) monotonic-deque windows; keep them off .apply().
     data['local_max'] = data['high'].rolling(20, center=True).max() == data['high']
     data['local_min'] = data['low'].rolling(20, center=True).min() == data['low']
     
@@ -61,25 +77,31 @@ def main():
     
     # Show major swings
     print("\nMajor turning points:")
-    all_points = []
-    for idx, val in peaks.items():
-        all_points.append((idx, val, 'PEAK'))
-    for idx, val in troughs.items():
-        all_points.append((idx, val, 'TROUGH'))
-    
-    all_points.sort(key=lambda x: x[0])
-    
-    for i, (date, price, ptype) in enumerate(all_points[:15]):
+    # Merge peak and trough positions with one stable argsort; on equal
+    # dates peaks stay ahead of troughs.
+    peak_idx = np.flatnonzero(data['local_max'].to_numpy())
+    trough_idx = np.flatnonzero(data['local_min'].to_numpy())
+    point_idx = np.concatenate([peak_idx, trough_idx])
+    point_price = np.concatenate([data['high'].to_numpy()[peak_idx],
+                                  data['low'].to_numpy()[trough_idx]])
+    point_type = np.array(['PEAK'] * len(peak_idx) + ['TROUGH'] * len(trough_idx))
+    order = np.argsort(point_idx, kind='stable')[:15]
+    
+    for date, price, ptype in zip(data.index[point_idx[order]], point_price[order], point_type[order]):
         print(f"  {date.strftime('%Y-%m-%d')}: ${price:.2f} ({ptype})")
     
     # What percentage of days are up vs down
     print("\n--- DAILY STATISTICS ---")
-    up_days = (data['returns'] > 0).sum()
-    down_days = (data['returns'] < 0).sum()
+    # Split returns once, then reduce each side (NaN compares False on both)
+    returns = data['returns'].to_numpy()
+    up_returns = returns[returns > 0]
+    down_returns = returns[returns < 0]
+    up_days = len(up_returns)
+    down_days = len(down_returns)
     print(f"Up days: {up_days} ({up_days/len(data)*100:.1f}%)")
     print(f"Down days: {down_days} ({down_days/len(data)*100:.1f}%)")
-    print(f"Average up day: +{data[data['returns']>0]['returns'].mean()*100:.2f}%")
-    print(f"Average down day: {data[data['returns']<0]['returns'].mean()*100:.2f}%")
+    print(f"Average up day: +{up_returns.mean()*100:.2f}%")
+    print(f"Average down day: {down_returns.mean()*100:.2f}%")
     
     # Best strategy type
     print("\n--- REGIME ANALYSIS ---")
@@ -100,7 +122,9 @@ def main():
     
     # What if we just bought and held when above 200 SMA?
     print("\n--- SIMPLE 200 SMA FILTER STRATEGY ---")
-    data['sma_200'] = ta.trend.sma_indicator(data['close'], window=200)
+    # Rolling mean is an O(N) running sum (add newest, drop oldest) with
+    # the same values as ta.trend.sma_indicator, minus the wrapper.
+    data['sma_200'] = data['close'].rolling(200, min_periods=200).mean()
     data['above_200'] = data['close'] > data['sma_200']
     
     # Calculate returns only when above 200 SMA
@@ -110,14 +134,8 @@ def main():
     
     # What about buying after 3 down days?
     print("\n--- MEAN REVERSION TEST ---")
-    data['down_streak'] = 0
-    down_streak = 0
-    for i in range(len(data)):
-        if data['returns'].iloc[i] < 0:
-            down_streak += 1
-        else:
-            down_streak = 0
-        data.iloc[i, data.columns.get_loc('down_streak')] = down_streak
+    arrays = to_soa(data, ['returns'])
+    data['down_streak'] = streak_lengths(arrays['returns'] < 0)
     
     # Return after 3+ down days
     data['buy_after_3_down'] = data['down_streak'].shift(1) >= 3
@@ -128,14 +146,7 @@ def main():
     
     # What about momentum? Buy after 3 up days?
     print("\n--- MOMENTUM TEST ---")
-    data['up_streak'] = 0
-    up_streak = 0
-    for i in range(len(data)):
-        if data['returns'].iloc[i] > 0:
-            up_streak += 1
-        else:
-            up_streak = 0
-        data.iloc[i, data.columns.get_loc('up_streak')] = up_streak
+    data['up_streak'] = streak_lengths(arrays['returns'] > 0)
     
     data['buy_after_3_up'] = data['up_streak'].shift(1) >= 3
     post_run_returns = data[data['buy_after_3_up']]['returns']
@@ -4,16 +4,17 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-import pandas as pd
 import numpy as np
 from pathlib import Path
 import ta
 
+from src.data.loader import read_ohlcv_csv
+
 
 def main():
     # Load data
     data_path = Path("data") / "XAU_USD_1D_sample.csv"
-    data = pd.read_csv(data_path, index_col=0, parse_dates=True)
+    data = read_ohlcv_csv(data_path)
     
     print(f"Data: {len(data)} bars")
     
@@ -34,45 +35,25 @@ def main():
     # Check trend conditions
     print("\n--- Checking Trend Conditions ---")
     
-    uptrends = 0
-    downtrends = 0
-    momentum_matches = 0
-    pullbacks = 0
-    
-    for i in range(60, len(data)):
-        # Trend check
-        ema_8 = data['ema_8'].iloc[i]
-        ema_21 = data['ema_21'].iloc[i]
-        ema_55 = data['ema_55'].iloc[i]
-        adx = data['adx'].iloc[i]
-        di_plus = data['di_plus'].iloc[i]
-        di_minus = data['di_minus'].iloc[i]
-        
-        # Check uptrend
-        if ema_8 > ema_21 > ema_55 and adx > 20 and di_plus > di_minus:
-            uptrends += 1
-            trend = 1
-        elif ema_8 < ema_21 < ema_55 and adx > 20 and di_minus > di_plus:
-            downtrends += 1
-            trend = -1
-        else:
-            trend = 0
-            continue
-        
-        # Check momentum
-        macd_hist = data['macd_hist'].iloc[i]
-        macd_hist_prev = data['macd_hist'].iloc[i-1]
-        rsi = data['rsi'].iloc[i]
-        
-        if trend == 1 and macd_hist > macd_hist_prev and rsi < 70:
-            momentum_matches += 1
-            
-            # Check pullback
-            close = data['close'].iloc[i]
-            bb_pct = data['bb_pct'].iloc[i]
-            
-            if bb_pct < 0.3 or rsi < 45:
-                pullbacks += 1
+    # Every check is an elementwise comparison, so build whole-column masks
+    # and count the bars from 60 onwards.
+    ema_8 = data['ema_8']
+    ema_21 = data['ema_21']
+    ema_55 = data['ema_55']
+    rsi = data['rsi']
+    close = data['close']
+    
+    uptrend = ((ema_8 > ema_21) & (ema_21 > ema_55) & (data['adx'] > 20)
+               & (data['di_plus'] > data['di_minus']))
+    downtrend = ((ema_8 < ema_21) & (ema_21 < ema_55) & (data['adx'] > 20)
+                 & (data['di_minus'] > data['di_plus']))
+    momentum = uptrend & (data['macd_hist'] > data['macd_hist'].shift(1)) & (rsi < 70)
+    pullback = momentum & ((data['bb_pct'] < 0.3) | (rsi < 45))
+    
+    uptrends = int(uptrend.iloc[60:].sum())
+    downtrends = int(downtrend.iloc[60:].sum())
+    momentum_matches = int(momentum.iloc[60:].sum())
+    pullbacks = int(pullback.iloc[60:].sum())
     
     print(f"Uptrend bars: {uptrends}")
     print(f"Downtrend bars: {downtrends}")
@@ -83,43 +64,28 @@ def main():
     print("\n--- Simple Signal Check ---")
     
     # Simple: EMA crossover + trend filter
-    signals = 0
-    for i in range(60, len(data)):
-        ema_8 = data['ema_8'].iloc[i]
-        ema_21 = data['ema_21'].iloc[i]
-        ema_8_prev = data['ema_8'].iloc[i-1]
-        ema_21_prev = data['ema_21'].iloc[i-1]
-        ema_55 = data['ema_55'].iloc[i]
-        rsi = data['rsi'].iloc[i]
-        
-        # Long: EMA 8 crosses above EMA 21, price above EMA 55, RSI not overbought
-        if ema_8 > ema_21 and ema_8_prev <= ema_21_prev:
-            if data['close'].iloc[i] > ema_55 and rsi < 70:
-                signals += 1
-        
-        # Short: EMA 8 crosses below EMA 21
-        if ema_8 < ema_21 and ema_8_prev >= ema_21_prev:
-            if data['close'].iloc[i] < ema_55 and rsi > 30:
-                signals += 1
+    ema_8_prev = ema_8.shift(1)
+    ema_21_prev = ema_21.shift(1)
+    
+    # Long: EMA 8 crosses above EMA 21, price above EMA 55, RSI not overbought
+    long_signal = (ema_8 > ema_21) & (ema_8_prev <= ema_21_prev) & (close > ema_55) & (rsi < 70)
+    # Short: EMA 8 crosses below EMA 21
+    short_signal = (ema_8 < ema_21) & (ema_8_prev >= ema_21_prev) & (close < ema_55) & (rsi > 30)
+    
+    signals = int(long_signal.iloc[60:].sum() + short_signal.iloc[60:].sum())
     
     print(f"EMA crossover signals: {signals}")
     
     # Even simpler: just RSI extremes + trend
     print("\n--- RSI Extreme Signals ---")
-    rsi_signals = 0
-    for i in range(60, len(data)):
-        rsi = data['rsi'].iloc[i]
-        rsi_prev = data['rsi'].iloc[i-1]
-        close = data['close'].iloc[i]
-        ema_55 = data['ema_55'].iloc[i]
-        
-        # RSI crossing 30 from below in uptrend
-        if rsi > 30 and rsi_prev <= 30 and close > ema_55:
-            rsi_signals += 1
-        
-        # RSI crossing 70 from above in downtrend  
-        if rsi < 70 and rsi_prev >= 70 and close < ema_55:
-            rsi_signals += 1
+    rsi_prev = rsi.shift(1)
+    
+    # RSI crossing 30 from below in uptrend
+    rsi_long = (rsi > 30) & (rsi_prev <= 30) & (close > ema_55)
+    # RSI crossing 70 from above in downtrend
+    rsi_short = (rsi < 70) & (rsi_prev >= 70) & (close < ema_55)
+    
+    rsi_signals = int(rsi_long.iloc[60:].sum() + rsi_short.iloc[60:].sum())
     
     print(f"RSI extreme signals: {rsi_signals}")
     
@@ -7,199 +7,122 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import pandas as pd
 import numpy as np
 from pathlib import Path
-import ta
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+from src.analysis import kernels
+from src.data.loader import read_ohlcv_csv
+from src.strategy.final_kernel import EXIT_REASONS, TRADE_DTYPE, fill_atr, final_loop
+from src.utils.soa import to_soa
 
 
 class FinalStrategy:
     """Optimized strategy with best parameters."""
     
+    # Best parameters from optimization
+    fast_ema = 5
+    slow_ema = 21
+    trend_ema = 55
+    sl_mult = 1.5
+    tp_mult = 3.0
+    trail_mult = 1.5
+    max_position = 0.15  # Notional cap as a fraction of capital
+    
+    # Columns added by precompute()
+    INDICATOR_COLUMNS = ('ema_fast', 'ema_slow', 'ema_trend', 'atr', 'rsi',
+                         'cross_up', 'cross_down')
+    
     def __init__(self, data, initial_capital=10000, risk_per_trade=0.02):
-        self.data = data.copy()
+        """
+        ``data`` may be raw OHLC or a frame already enriched by
+        ``precompute``. An enriched frame is used as is, without a copy:
+        the backtest only reads it, so runs can share one frame.
+        """
+        if all(col in data.columns for col in self.INDICATOR_COLUMNS):
+            self.data = data
+        else:
+            self.data = self.precompute(data)
         self.initial_capital = initial_capital
         self.risk_per_trade = risk_per_trade
         
-        # Best parameters from optimization
-        self.fast_ema = 5
-        self.slow_ema = 21
-        self.trend_ema = 55
-        self.sl_mult = 1.5
-        self.tp_mult = 3.0
-        self.trail_mult = 1.5
-        
-        self.positions = pd.Series(index=data.index, data=0.0)
-        self.capital = pd.Series(index=data.index, data=0.0)
-        self.trades = []
-        
-        self._calculate_indicators()
+        # The bar loop writes into these buffers; backtest() wraps them in
+        # Series once it has run.
+        self._pos = np.zeros(len(data))
+        self._cap = np.zeros(len(data))
+        self.positions = pd.Series(self._pos, index=data.index)
+        self.capital = pd.Series(self._cap, index=data.index)
+        self.trades = pd.DataFrame()
+        self.trade_records = np.empty(0, dtype=TRADE_DTYPE)
     
-    def _calculate_indicators(self):
-        self.data['ema_fast'] = ta.trend.ema_indicator(self.data['close'], window=self.fast_ema)
-        self.data['ema_slow'] = ta.trend.ema_indicator(self.data['close'], window=self.slow_ema)
-        self.data['ema_trend'] = ta.trend.ema_indicator(self.data['close'], window=self.trend_ema)
-        self.data['atr'] = ta.volatility.average_true_range(
-            self.data['high'], self.data['low'], self.data['close'], window=14
-        )
-        self.data['rsi'] = ta.momentum.rsi(self.data['close'], window=14)
-        
-        self.data['cross_up'] = (
-            (self.data['ema_fast'] > self.data['ema_slow']) & 
-            (self.data['ema_fast'].shift(1) <= self.data['ema_slow'].shift(1))
-        )
-        self.data['cross_down'] = (
-            (self.data['ema_fast'] < self.data['ema_slow']) &
-            (self.data['ema_fast'].shift(1) >= self.data['ema_slow'].shift(1))
-        )
+    @classmethod
+    def precompute(cls, data):
+        """
+        Return a copy of ``data`` with the strategy's indicator columns.
+        
+        Indicators do not depend on capital or risk, so one enriched frame
+        can be shared by every ``FinalStrategy`` run over the same data.
+        """
+        df = data.copy()
+        
+        # Array kernels give the same values as the ta indicators without
+        # building intermediate Series for every step.
+        close = df['close'].to_numpy(dtype=np.float64)
+        high = df['high'].to_numpy(dtype=np.float64)
+        low = df['low'].to_numpy(dtype=np.float64)
+        
+        fast = kernels.ema(close, cls.fast_ema)
+        slow = kernels.ema(close, cls.slow_ema)
+        df['ema_fast'] = fast
+        df['ema_slow'] = slow
+        df['ema_trend'] = kernels.ema(close, cls.trend_ema)
+        df['atr'] = fill_atr(kernels.atr(high, low, close, 14), close)
+        df['rsi'] = kernels.rsi(close, 14)
+        
+        df['cross_up'], df['cross_down'] = kernels.crossovers(fast, slow)
+        return df
     
     def backtest(self):
-        capital = self.initial_capital
-        position = 0
-        entry_price = 0
-        stop_loss = 0
-        take_profit = 0
-        highest = 0
-        lowest = float('inf')
-        
-        self.trades = []
-        current_trade = None
-        
-        for i in range(66, len(self.data)):
-            close = self.data['close'].iloc[i]
-            high = self.data['high'].iloc[i]
-            low = self.data['low'].iloc[i]
-            atr = self.data['atr'].iloc[i]
-            ema_trend = self.data['ema_trend'].iloc[i]
-            rsi = self.data['rsi'].iloc[i]
-            
-            if pd.isna(atr) or atr <= 0:
-                atr = close * 0.01
-            
-            # Position management
-            if position > 0:
-                highest = max(highest, high)
-                trail = highest - atr * self.trail_mult
-                eff_stop = max(stop_loss, trail)
-                
-                if low <= eff_stop:
-                    pnl = (eff_stop - entry_price) * position
-                    capital += pnl
-                    if current_trade:
-                        current_trade['exit_price'] = eff_stop
-                        current_trade['exit_reason'] = 'stop'
-                        current_trade['pnl'] = pnl
-                        self.trades.append(current_trade)
-                    position = 0
-                    current_trade = None
-                elif high >= take_profit:
-                    pnl = (take_profit - entry_price) * position
-                    capital += pnl
-                    if current_trade:
-                        current_trade['exit_price'] = take_profit
-                        current_trade['exit_reason'] = 'take_profit'
-                        current_trade['pnl'] = pnl
-                        self.trades.append(current_trade)
-                    position = 0
-                    current_trade = None
-                elif self.data['cross_down'].iloc[i]:
-                    pnl = (close - entry_price) * position
-                    capital += pnl
-                    if current_trade:
-                        current_trade['exit_price'] = close
-                        current_trade['exit_reason'] = 'signal'
-                        current_trade['pnl'] = pnl
-                        self.trades.append(current_trade)
-                    position = 0
-                    current_trade = None
-            
-            elif position < 0:
-                lowest = min(lowest, low)
-                trail = lowest + atr * self.trail_mult
-                eff_stop = min(stop_loss, trail)
-                
-                if high >= eff_stop:
-                    pnl = (entry_price - eff_stop) * abs(position)
-                    capital += pnl
-                    if current_trade:
-                        current_trade['exit_price'] = eff_stop
-                        current_trade['exit_reason'] = 'stop'
-                        current_trade['pnl'] = pnl
-                        self.trades.append(current_trade)
-                    position = 0
-                    current_trade = None
-                elif low <= take_profit:
-                    pnl = (entry_price - take_profit) * abs(position)
-                    capital += pnl
-                    if current_trade:
-                        current_trade['exit_price'] = take_profit
-                        current_trade['exit_reason'] = 'take_profit'
-                        current_trade['pnl'] = pnl
-                        self.trades.append(current_trade)
-                    position = 0
-                    current_trade = None
-                elif self.data['cross_up'].iloc[i]:
-                    pnl = (entry_price - close) * abs(position)
-                    capital += pnl
-                    if current_trade:
-                        current_trade['exit_price'] = close
-                        current_trade['exit_reason'] = 'signal'
-                        current_trade['pnl'] = pnl
-                        self.trades.append(current_trade)
-                    position = 0
-                    current_trade = None
-            
-            # Entry
-            if position == 0:
-                signal = 0
-                if self.data['cross_up'].iloc[i] and close > ema_trend and rsi < 70:
-                    signal = 1
-                elif self.data['cross_down'].iloc[i] and close < ema_trend and rsi > 30:
-                    signal = -1
-                
-                if signal != 0:
-                    if signal == 1:
-                        stop_loss = close - atr * self.sl_mult
-                        take_profit = close + atr * self.tp_mult
-                        risk = close - stop_loss
-                    else:
-                        stop_loss = close + atr * self.sl_mult
-                        take_profit = close - atr * self.tp_mult
-                        risk = stop_loss - close
-                    
-                    if risk > 0:
-                        size = (capital * self.risk_per_trade) / risk
-                        max_size = (capital * 0.15) / close
-                        size = min(size, max_size)
-                        
-                        position = size if signal > 0 else -size
-                        entry_price = close
-                        highest = close
-                        lowest = close
-                        
-                        current_trade = {
-                            'entry_date': self.data.index[i],
-                            'entry_price': entry_price,
-                            'side': 'long' if signal > 0 else 'short',
-                            'size': abs(position)
-                        }
-            
-            self.positions.iloc[i] = position
-            unrealized = (close - entry_price) * position if position != 0 else 0
-            self.capital.iloc[i] = capital + unrealized
+        arrays = to_soa(self.data, ['close', 'high', 'low', 'atr', 'ema_trend', 'rsi',
+                                    'cross_up', 'cross_down'])
+        self._pos[:] = 0.0
+        self._cap[:] = 0.0
+        capital, records = final_loop(
+            arrays['close'], arrays['high'], arrays['low'], arrays['atr'],
+            arrays['ema_trend'], arrays['rsi'], arrays['cross_up'], arrays['cross_down'],
+            66, float(self.initial_capital), self.risk_per_trade,
+            self.sl_mult, self.tp_mult, self.trail_mult, self.max_position, 0.0,
+            self._pos, self._cap
+        )
         
-        if position != 0:
-            close = self.data['close'].iloc[-1]
-            pnl = (close - entry_price) * position if position > 0 else (entry_price - close) * abs(position)
-            capital += pnl
-            if current_trade:
-                current_trade['exit_price'] = close
-                current_trade['exit_reason'] = 'end'
-                current_trade['pnl'] = pnl
-                self.trades.append(current_trade)
+        dates = self.data.index
+        self.positions = pd.Series(self._pos, index=dates)
+        self.capital = pd.Series(self._cap, index=dates)
+        
+        # Trades come back as a TRADE_DTYPE record array; build the trade
+        # table from its columns in one go.
+        self.trade_records = records
+        self.trades = pd.DataFrame({
+            'entry_date': dates[records['entry_i']],
+            'entry_price': records['entry_price'],
+            'side': np.where(records['side'] > 0, 'long', 'short'),
+            'size': records['size'],
+            'exit_price': records['exit_price'],
+            'exit_reason': np.array(EXIT_REASONS)[records['reason']],
+            'pnl': records['pnl'],
+        })
         
         return capital
 
 
+def _run_one_risk(data, risk):
+    """Backtest one risk level; returns (risk, final, trades, capital curve)."""
+    s = FinalStrategy(data, initial_capital=10000, risk_per_trade=risk)
+    final = s.backtest()
+    return risk, final, s.trades, s.capital
+
+
 def main():
-    data = pd.read_csv(Path("data") / "XAU_USD_1D_sample.csv", index_col=0, parse_dates=True)
+    data = read_ohlcv_csv(Path("data") / "XAU_USD_1D_sample.csv")
     
     print("=" * 70)
     print("FINAL PROFITABILITY TEST")
@@ -220,35 +143,44 @@ def main():
     best_risk = None
     best_return = -100
     
-    for risk in [0.01, 0.02, 0.03, 0.04, 0.05]:
-        s = FinalStrategy(data.copy(), initial_capital=10000, risk_per_trade=risk)
-        final = s.backtest()
-        
+    # Each risk level is an independent backtest, so run them in parallel
+    # and report in the original order.
+    # Indicators are independent of the risk level: compute them once.
+    enriched = FinalStrategy.precompute(data)
+    risks = [0.01, 0.02, 0.03, 0.04, 0.05]
+    with ProcessPoolExecutor(max_workers=min(len(risks), os.cpu_count() or 1)) as executor:
+        runs = list(executor.map(_run_one_risk, repeat(enriched), risks))
+    
+    for risk, final, trades, capital in runs:
         ret = ((final - 10000) / 10000) * 100
         
-        if s.trades:
-            df = pd.DataFrame(s.trades)
-            winners = df[df['pnl'] > 0]
-            losers = df[df['pnl'] < 0]
-            wr = len(winners) / len(df) * 100
-            gp = winners['pnl'].sum() if len(winners) > 0 else 0
-            gl = abs(losers['pnl'].sum()) if len(losers) > 0 else 0
+        if len(trades):
+            pnl = trades['pnl'].to_numpy()
+            wins = pnl[pnl > 0]
+            losses = pnl[pnl < 0]
+            wr = wins.size / pnl.size * 100
+            gp = wins.sum()
+            gl = abs(losses.sum())
             pf = gp / gl if gl > 0 else 999
             
-            equity = s.capital.dropna()
-            rm = equity.expanding().max()
-            dd = ((equity - rm) / rm).min() * -100
+            # Running peak in one cumulative pass; bars before the first
+            # trade have zero equity, whose 0/0 drawdown is skipped.
+            equity = capital.to_numpy()
+            equity = equity[~np.isnan(equity)]
+            rm = np.maximum.accumulate(equity)
+            with np.errstate(invalid='ignore'):
+                dd = np.nanmin((equity - rm) / rm) * -100
         else:
             wr = 0
             pf = 0
             dd = 0
         
-        print(f"{risk*100:>8.0f} {ret:>+10.2f} {final:>12,.2f} {len(s.trades):>8} {wr:>8.1f} {pf:>8.2f} {dd:>8.2f}")
+        print(f"{risk*100:>8.0f} {ret:>+10.2f} {final:>12,.2f} {len(trades):>8} {wr:>8.1f} {pf:>8.2f} {dd:>8.2f}")
         
         if ret > best_return:
             best_return = ret
             best_risk = risk
-            best_strategy = s
+            best_trades = trades
     
     print("-" * 70)
     
@@ -257,8 +189,8 @@ def main():
     print(f"  Risk per trade: {best_risk*100:.0f}%")
     print(f"  Return: {best_return:+.2f}%")
     
-    if best_strategy.trades:
-        df = pd.DataFrame(best_strategy.trades)
+    if len(best_trades):
+        df = best_trades
         winners = df[df['pnl'] > 0]
         losers = df[df['pnl'] < 0]
         
@@ -285,12 +217,12 @@ def main():
             print(f"    {reason}: {count} trades, ${pnl:+,.2f}")
         
         print(f"\n  Sample trades:")
-        for i, t in enumerate(best_strategy.trades[:8]):
-            print(f"    {t['side']:5} ${t['entry_price']:.2f} -> ${t['exit_price']:.2f} = ${t['pnl']:+,.2f} ({t['exit_reason']})")
+        for t in best_trades.head(8).itertuples():
+            print(f"    {t.side:5} ${t.entry_price:.2f} -> ${t.exit_price:.2f} = ${t.pnl:+,.2f} ({t.exit_reason})")
     
     # Final verdict
     print("\n" + "=" * 70)
-    if best_return > 20 and len(best_strategy.trades) >= 20:
+    if best_return > 20 and len(best_trades) >= 20:
         print("🏆 HIGHLY PROFITABLE STRATEGY!")
     elif best_return > 10:
         print("✅ PROFITABLE STRATEGY!")
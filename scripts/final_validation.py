@@ -8,46 +8,78 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-import pandas as pd
 import numpy as np
 from pathlib import Path
-import ta
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 
+from src.analysis import kernels
+from src.data.loader import read_ohlcv_csv
+from src.strategy.aggressive_kernel import grid_search
+from src.utils.soa import to_soa
 
-def run_stress_test(data, risk_pct=0.08, atr_sl=0.8, atr_tp=1.5, num_simulations=100):
+
+def run_stress_test(data, risk_pct=0.08, atr_sl=0.8, atr_tp=1.5, num_simulations=100, seed=42):
     """Run Monte Carlo stress test."""
     
-    results = []
+    # Draw every random start and all price noise up front in two batched
+    # calls; a seeded Generator makes the run reproducible.
+    rng = np.random.default_rng(seed)
+    starts = rng.integers(80, len(data) - 60, size=num_simulations)
+    noise = rng.normal(0, 0.001, size=(num_simulations, 60))
     
-    for sim in range(num_simulations):
-        # Random starting point
-        start = np.random.randint(80, len(data) - 60)
+    windows = []
+    for sim, start in enumerate(starts):
         window = data.iloc[start:start+60].copy()
         
         # Add some noise to simulate real conditions
-        noise_factor = 1 + np.random.normal(0, 0.001, len(window))
-        window['close'] = window['close'] * noise_factor
-        
-        # Run backtest
-        result = backtest_challenge(window, risk_pct, atr_sl, atr_tp)
-        results.append(result)
+        window['close'] = window['close'] * (1 + noise[sim])
+        windows.append(window)
+    
+    # Simulations are independent: backtest them across processes. The
+    # randomness was drawn above, so results do not depend on scheduling.
+    n = len(windows)
+    with ProcessPoolExecutor() as executor:
+        results = list(executor.map(
+            backtest_challenge, windows, repeat(risk_pct, n), repeat(atr_sl, n), repeat(atr_tp, n),
+            chunksize=max(1, n // (4 * (os.cpu_count() or 1)))
+        ))
     
     return results
 
 
+CHALLENGE_INDICATORS = ('ema_3', 'ema_8', 'rsi', 'atr', 'macd', 'macd_sig')
+
+
+def add_challenge_indicators(data):
+    """Return a copy of ``data`` with the indicators backtest_challenge uses."""
+    df = data.copy()
+    close = df['close'].to_numpy(dtype=np.float64)
+    high = df['high'].to_numpy(dtype=np.float64)
+    low = df['low'].to_numpy(dtype=np.float64)
+    
+    # Array kernels reproduce the ta indicators (warm-up NaNs included)
+    # without building a pandas ewm/rolling pipeline per indicator.
+    df['ema_3'] = kernels.ema(close, 3)
+    df['ema_8'] = kernels.ema(close, 8)
+    df['rsi'] = kernels.rsi(close, 5)
+    df['atr'] = kernels.atr(high, low, close, 10)
+    df['macd'], df['macd_sig'] = kernels.macd(close)
+    return df
+
+
 def backtest_challenge(data, risk_pct=0.08, atr_sl=0.8, atr_tp=1.5):
-    """Backtest prop firm challenge."""
+    """
+    Backtest prop firm challenge.
     
-    df = data.copy()
+    ``data`` may already carry the indicators from add_challenge_indicators
+    (e.g. when one window is replayed at several risk levels).
+    """
     
-    # Calculate indicators
-    df['ema_3'] = ta.trend.ema_indicator(df['close'], window=3)
-    df['ema_8'] = ta.trend.ema_indicator(df['close'], window=8)
-    df['rsi'] = ta.momentum.rsi(df['close'], window=5)
-    df['atr'] = ta.volatility.average_true_range(df['high'], df['low'], df['close'], window=10)
-    macd = ta.trend.MACD(df['close'])
-    df['macd'] = macd.macd()
-    df['macd_sig'] = macd.macd_signal()
+    if all(col in data.columns for col in CHALLENGE_INDICATORS):
+        df = data
+    else:
+        df = add_challenge_indicators(data)
     
     capital = 10000
     start = capital
@@ -58,13 +90,22 @@ def backtest_challenge(data, risk_pct=0.08, atr_sl=0.8, atr_tp=1.5):
     tp = 0
     trail = 0
     
-    trades = []
+    # Only the trade count and winners are reported, so keep running
+    # tallies instead of a list of per-trade P&L.
+    n_trades = 0
+    n_wins = 0
+    
+    # Fall back to 1% of price where ATR is undefined, once for the whole
+    # window rather than with a pd.isna check on every bar.
+    closes = df['close'].to_numpy()
+    atrs = df['atr'].to_numpy()
+    atrs = np.where(np.isnan(atrs), closes * 0.01, atrs)
     
     for i in range(25, min(55, len(df))):
         close = df['close'].iloc[i]
         high = df['high'].iloc[i]
         low = df['low'].iloc[i]
-        atr = df['atr'].iloc[i] if not pd.isna(df['atr'].iloc[i]) else close * 0.01
+        atr = atrs[i]
         
         # Manage position
         if position > 0:
@@ -75,12 +116,14 @@ def backtest_challenge(data, risk_pct=0.08, atr_sl=0.8, atr_tp=1.5):
             if low <= eff_sl:
                 pnl = (eff_sl - entry) * position
                 capital += pnl
-                trades.append(pnl)
+                n_trades += 1
+                n_wins += pnl > 0
                 position = 0
             elif high >= tp:
                 pnl = (tp - entry) * position
                 capital += pnl
-                trades.append(pnl)
+                n_trades += 1
+                n_wins += pnl > 0
                 position = 0
         
         elif position < 0:
@@ -91,12 +134,14 @@ def backtest_challenge(data, risk_pct=0.08, atr_sl=0.8, atr_tp=1.5):
             if high >= eff_sl:
                 pnl = (entry - eff_sl) * abs(position)
                 capital += pnl
-                trades.append(pnl)
+                n_trades += 1
+                n_wins += pnl > 0
                 position = 0
             elif low <= tp:
                 pnl = (entry - tp) * abs(position)
                 capital += pnl
-                trades.append(pnl)
+                n_trades += 1
+                n_wins += pnl > 0
                 position = 0
         
         # New entry
@@ -166,14 +211,15 @@ def backtest_challenge(data, risk_pct=0.08, atr_sl=0.8, atr_tp=1.5):
         else:
             pnl = (entry - close) * abs(position)
         capital += pnl
-        trades.append(pnl)
+        n_trades += 1
+        n_wins += pnl > 0
     
     return {
         'passed': capital >= start * 1.10, 
         'failed': False,
         'profit': (capital - start) / start * 100,
-        'trades': len(trades),
-        'win_rate': len([t for t in trades if t > 0]) / len(trades) * 100 if trades else 0
+        'trades': n_trades,
+        'win_rate': n_wins / n_trades * 100 if n_trades else 0
     }
 
 
@@ -182,15 +228,20 @@ def main():
     print("🔬 FINAL VALIDATION & STRESS TESTING")
     print("=" * 70)
     
-    data = pd.read_csv(Path("data") / "XAU_USD_1D_sample.csv", index_col=0, parse_dates=True)
+    data = read_ohlcv_csv(Path("data") / "XAU_USD_1D_sample.csv")
     
     # Test 1: Standard backtest
     print("\n📊 TEST 1: Standard Backtest (all periods)")
     print("-" * 50)
     
+    # Indicators only depend on past prices, so compute them once over the
+    # whole series and let every window slice into them (windows start at
+    # bar 80, well past the warm-up).
+    enriched = add_challenge_indicators(data)
+    
     all_results = []
     for start in range(80, len(data) - 60, 10):
-        window = data.iloc[start:start+60]
+        window = enriched.iloc[start:start+60]
         if len(window) < 55:
             continue
         result = backtest_challenge(window)
@@ -237,20 +288,24 @@ def main():
     print("-" * 50)
     print(f"{'Risk%':>8} {'Pass Rate':>12} {'Avg Profit':>12} {'Worst':>10}")
     
-    for risk in [0.05, 0.06, 0.07, 0.08, 0.09, 0.10]:
-        results = []
-        for start in range(80, len(data) - 60, 15):
-            window = data.iloc[start:start+60]
-            if len(window) < 55:
-                continue
-            result = backtest_challenge(window, risk_pct=risk)
-            results.append(result)
-        
-        pr = len([r for r in results if r['passed']]) / len(results) * 100
-        avg_profit = np.mean([r['profit'] for r in results])
-        worst = min(r['profit'] for r in results)
-        
-        print(f"{risk*100:>8.0f} {pr:>12.1f}% {avg_profit:>+12.2f}% {worst:>+10.2f}%")
+    # The strategy is the aggressive challenge loop with all signals on, so
+    # sweep every risk level over every window in one compiled, threaded
+    # grid search on the enriched full-series arrays.
+    arrays = to_soa(enriched, ['close', 'high', 'low', 'ema_3', 'ema_8', 'rsi',
+                               'macd', 'macd_sig', 'atr'], dtype=np.float64)
+    starts = np.array([start for start in range(80, len(data) - 60, 15)
+                       if min(start + 60, len(data)) - start >= 55])
+    risks = [0.05, 0.06, 0.07, 0.08, 0.09, 0.10]
+    grid = grid_search(
+        arrays['close'], arrays['high'], arrays['low'], arrays['ema_3'], arrays['ema_8'],
+        arrays['rsi'], arrays['macd'], arrays['macd_sig'], arrays['atr'],
+        np.array(risks), np.array([0.8]), np.array([1.5]), starts, 60, 10000.0
+    )
+    
+    for risk, cell in zip(risks, grid[:, 0, 0]):
+        profits = cell[:, 0]
+        pr = cell[:, 1].sum() / len(cell) * 100
+        print(f"{risk*100:>8.0f} {pr:>12.1f}% {profits.mean():>+12.2f}% {profits.min():>+10.2f}%")
     
     # Expected Value calculation
     print("\n" + "=" * 70)
@@ -3,11 +3,43 @@ Generate realistic XAU/USD sample data for demonstration purposes.
 This allows users to run the bot without needing an API key.
 """
 
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from pathlib import Path
 
+from src.utils.jit import njit
+
+
+@njit(cache=True)
+def _price_path(initial_price, shocks, jumps, mean_price, reversion_speed, trend, dt):
+    """
+    Run the mean-reverting GBM recurrence over pre-drawn random inputs.
+    
+    ``shocks`` are the scaled Brownian increments and ``jumps`` the
+    relative news jumps (0 where there is none) for bars 1..n-1. The
+    floor makes the recurrence non-linear, so it is stepped bar by bar.
+    """
+    n = len(shocks) + 1
+    prices = np.empty(n)
+    prices[0] = initial_price
+    floor = initial_price * 0.7  # Floor at 70% of initial
+    
+    for i in range(1, n):
+        prev_price = prices[i - 1]
+        mean_reversion = reversion_speed * (mean_price - prev_price) * dt
+        drift = trend * dt * prev_price
+        new_price = prev_price * (1 + shocks[i - 1]) + mean_reversion + drift
+        new_price *= 1 + jumps[i - 1]
+        prices[i] = max(new_price, floor)
+    
+    return prices
+
+
 def generate_gold_price_data(
     start_date: str = "2023-01-01",
     end_date: str = "2024-12-01",
@@ -31,7 +63,7 @@ def generate_gold_price_data(
     Returns:
         DataFrame with OHLCV data
     """
-    np.random.seed(seed)
+    rng = np.random.default_rng(seed)
     
     # Generate date range (hourly data)
     dates = pd.date_range(start=start_date, end=end_date, freq='1H')
@@ -42,72 +74,47 @@ def generate_gold_price_data(
     mean_price = initial_price * 1.1  # Mean reversion target
     reversion_speed = 0.01
     
-    prices = [initial_price]
-    for i in range(1, n):
-        prev_price = prices[-1]
-        
-        # Mean reversion component
-        mean_reversion = reversion_speed * (mean_price - prev_price) * dt
-        
-        # Random component (Brownian motion)
-        random_shock = volatility * np.sqrt(dt) * np.random.normal()
-        
-        # Trend component
-        drift = trend * dt * prev_price
-        
-        # New price
-        new_price = prev_price * (1 + random_shock) + mean_reversion + drift
-        
-        # Add occasional jumps (news events)
-        if np.random.random() < 0.005:  # 0.5% chance of jump
-            jump = np.random.choice([-1, 1]) * np.random.uniform(0.01, 0.03)
-            new_price *= (1 + jump)
-        
-        prices.append(max(new_price, initial_price * 0.7))  # Floor at 70% of initial
+    # Draw all randomness for the path in batched calls: Brownian shocks
+    # and occasional news jumps (0.5% chance per bar, 1-3% either way).
+    shocks = volatility * np.sqrt(dt) * rng.normal(size=n - 1)
+    jump_mask = rng.random(n - 1) < 0.005
+    jumps = rng.choice([-1.0, 1.0], size=n - 1) * rng.uniform(0.01, 0.03, size=n - 1) * jump_mask
     
-    prices = np.array(prices)
+    prices = _price_path(initial_price, shocks, jumps, mean_price, reversion_speed, trend, dt)
     
-    # Generate OHLC from close prices
-    data = []
-    for i, date in enumerate(dates):
-        close = prices[i]
-        
-        # Generate realistic intraday range
-        daily_range = close * np.random.uniform(0.002, 0.008)
-        
-        # High and low with some randomness
-        high_offset = np.random.uniform(0.3, 0.8) * daily_range
-        low_offset = np.random.uniform(0.3, 0.8) * daily_range
-        
-        high = close + high_offset
-        low = close - low_offset
-        
-        # Open between high and low
-        open_price = np.random.uniform(low, high)
-        
-        # Volume with some patterns (higher during market hours)
-        hour = date.hour
-        base_volume = 50000
-        if 8 <= hour <= 16:  # London/NY overlap
-            volume_mult = np.random.uniform(1.5, 2.5)
-        elif 0 <= hour <= 7:  # Asian session
-            volume_mult = np.random.uniform(0.8, 1.2)
-        else:
-            volume_mult = np.random.uniform(1.0, 1.5)
-        
-        volume = int(base_volume * volume_mult * np.random.uniform(0.8, 1.2))
-        
-        data.append({
-            'datetime': date,
-            'open': round(open_price, 2),
-            'high': round(high, 2),
-            'low': round(low, 2),
-            'close': round(close, 2),
-            'volume': volume
-        })
-    
-    df = pd.DataFrame(data)
-    df.set_index('datetime', inplace=True)
+    # Generate OHLC from close prices, one batched draw per column
+    close = prices
+    
+    # Generate realistic intraday range
+    daily_range = close * rng.uniform(0.002, 0.008, size=n)
+    
+    # High and low with some randomness
+    high = close + rng.uniform(0.3, 0.8, size=n) * daily_range
+    low = close - rng.uniform(0.3, 0.8, size=n) * daily_range
+    
+    # Open between high and low
+    open_price = low + rng.random(n) * (high - low)
+    
+    # Volume with some patterns (higher during market hours)
+    hours = dates.hour.to_numpy()
+    base_volume = 50000
+    volume_mult = np.where(
+        (hours >= 8) & (hours <= 16),  # London/NY overlap
+        rng.uniform(1.5, 2.5, size=n),
+        np.where(hours <= 7,  # Asian session
+                 rng.uniform(0.8, 1.2, size=n),
+                 rng.uniform(1.0, 1.5, size=n))
+    )
+    volume = (base_volume * volume_mult * rng.uniform(0.8, 1.2, size=n)).astype(np.int64)
+    
+    df = pd.DataFrame({
+        'open': open_price,
+        'high': high,
+        'low': low,
+        'close': close,
+        'volume': volume
+    }, index=pd.Index(dates, name='datetime'))
+    df[['open', 'high', 'low', 'close']] = df[['open', 'high', 'low', 'close']].round(2)
     
     return df
 
@@ -122,11 +129,15 @@ def generate_multiple_timeframes(base_data: pd.DataFrame) -> dict:
     Returns:
         Dictionary with different timeframe DataFrames
     """
+    # Each coarser timeframe's bins are unions of the finer one's, so
+    # resample from the previous result rather than re-binning every hour.
+    four_hour = resample_ohlcv(base_data, '4H')
+    daily = resample_ohlcv(four_hour, '1D')
     timeframes = {
         '1H': base_data.copy(),
-        '4H': resample_ohlcv(base_data, '4H'),
-        '1D': resample_ohlcv(base_data, '1D'),
-        '1W': resample_ohlcv(base_data, '1W')
+        '4H': four_hour,
+        '1D': daily,
+        '1W': resample_ohlcv(daily, '1W')
     }
     return timeframes
 
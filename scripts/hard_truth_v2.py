@@ -11,21 +11,24 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from src.strategy.real_trading import BrokerParams
 
-def simulate_100_dollar_account():
+
+def simulate_100_dollar_account(seed=42):
     """Simulate trading with exactly $100 - brutal honesty."""
     
     print("=" * 70)
     print("🔴 HARD TRUTH: What Happens to Your $100")
     print("=" * 70)
     
-    # Real broker conditions
+    # Real broker conditions: $0.35 per oz spread, commission included in
+    # the spread (as at most brokers), 0.01 lot minimum and 1:100 leverage
+    broker = BrokerParams(spread_cost=0.35, commission=0.0)
     STARTING_CAPITAL = 100
     GOLD_PRICE = 2650  # Current approximate price
-    MIN_LOT = 0.01  # Minimum lot size (1 oz)
-    SPREAD = 0.35  # $0.35 per oz spread
-    COMMISSION = 0  # Most brokers include in spread
-    LEVERAGE = 100  # 1:100 leverage (typical)
+    MIN_LOT = broker.min_lot
+    SPREAD = broker.spread_cost
+    LEVERAGE = broker.leverage
     MARGIN_CALL_LEVEL = 0.50  # 50% margin call
     
     # What 0.01 lot means
@@ -93,33 +96,20 @@ def simulate_100_dollar_account():
     win_rate = 0.50  # Our strategy's actual win rate
     risk_reward = 1.5  # Our R:R
     
-    results = []
-    for _ in range(1000):
-        capital = STARTING_CAPITAL
-        
-        for trade in range(10):
-            if capital < margin_required:
-                break  # Can't trade anymore
-            
-            # Pay spread
-            capital -= spread_cost
-            
-            # Trade outcome
-            if np.random.random() < win_rate:
-                # Win
-                profit = stop_distance * risk_reward
-                capital += profit
-            else:
-                # Loss
-                capital -= stop_distance
-            
-            if capital <= 0:
-                capital = 0
-                break
-        
-        results.append(capital)
-    
-    results = np.array(results)
+    # All 1000 x 10 outcomes at once from a seeded Generator, so the run is
+    # reproducible; each trade pays the spread and then wins
+    # stop_distance * risk_reward or loses stop_distance
+    rng = np.random.default_rng(seed)
+    wins = rng.random((1000, 10)) < win_rate
+    pnl = np.where(wins, stop_distance * risk_reward, -stop_distance) - spread_cost
+    equity = STARTING_CAPITAL + np.cumsum(pnl, axis=1)
+    
+    # A path stops trading after the first trade that leaves it without
+    # margin for the next one (a blown account is floored at $0)
+    stopped = equity < margin_required
+    has_stopped = stopped.any(axis=1)
+    last_trade = np.where(has_stopped, stopped.argmax(axis=1), equity.shape[1] - 1)
+    results = np.maximum(equity[np.arange(len(equity)), last_trade], 0)
     
     blown = np.sum(results <= 0) / len(results) * 100
     survived = np.sum(results > 0) / len(results) * 100
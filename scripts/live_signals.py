@@ -14,12 +14,28 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime
 from pathlib import Path
 import json
+import time
 import requests
 import ta
 
+from src.analysis import kernels
+
+try:
+    import orjson  # Optional: much faster JSON encoding
+except ImportError:
+    orjson = None
+
+
+def _to_json(obj, indent=False):
+    """Encode a signal as JSON bytes, with orjson when it is installed."""
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, default=str, option=option)
+    return json.dumps(obj, indent=2 if indent else None, default=str).encode()
+
 
 class LiveSignalGenerator:
     """Generate live trading signals for prop firm challenge."""
@@ -29,43 +45,138 @@ class LiveSignalGenerator:
     ATR_SL = 0.8
     ATR_TP = 1.5
     
+    # Daily bars change at most once a day, so a fetched history is
+    # reused for this long before Yahoo Finance is asked again
+    CACHE_TTL = 12 * 3600  # seconds
+    
+    # Yahoo Finance tickers fetched on each run, gold futures first.
+    # Correlated markets (e.g. 'SI=F', 'DX-Y.NYB') can be appended and are
+    # downloaded in the same batched request.
+    TICKERS = ['GC=F']
+    
     def __init__(self):
         self.data_path = Path("data")
-        self.signal_log = self.data_path / "signal_log.json"
+        # History is append-only JSON lines; the one mutable entry, the
+        # pending signal, lives in its own small file
+        self.signal_log = self.data_path / "signal_log.jsonl"
+        self.pending_file = self.data_path / "pending.json"
+        # Single-file log written by earlier versions
+        self.legacy_signal_log = self.data_path / "signal_log.json"
+        self.yf_cache = self.data_path / "yf_cache.parquet"
         self.load_signal_log()
     
     def load_signal_log(self):
         """Load signal history."""
+        if (not self.signal_log.exists() and not self.pending_file.exists()
+                and self.legacy_signal_log.exists()):
+            self.import_legacy_signal_log()
+        
+        self.signals = {'history': [], 'pending': None}
         if self.signal_log.exists():
             with open(self.signal_log, 'r') as f:
-                self.signals = json.load(f)
-        else:
-            self.signals = {'history': [], 'pending': None}
+                self.signals['history'] = [json.loads(line) for line in f if line.strip()]
+        if self.pending_file.exists():
+            with open(self.pending_file, 'r') as f:
+                self.signals['pending'] = json.load(f)
+    
+    def import_legacy_signal_log(self):
+        """
+        Split a ``signal_log.json`` into the history log and the pending
+        file. The old file is left in place; it is not read again once the
+        new files exist.
+        """
+        with open(self.legacy_signal_log, 'r') as f:
+            legacy = json.load(f)
+        
+        with open(self.signal_log, 'wb') as f:
+            f.writelines(_to_json(signal) + b"\n" for signal in legacy.get('history', []))
+        if legacy.get('pending') is not None:
+            with open(self.pending_file, 'wb') as f:
+                f.write(_to_json(legacy['pending'], indent=True))
+    
+    def save_signal_log(self, signal):
+        """Record a new signal: append it to the history and make it pending."""
+        self.signals['history'].append(signal)
+        self.signals['pending'] = signal
+        
+        with open(self.signal_log, 'ab') as f:
+            f.write(_to_json(signal) + b"\n")
+        with open(self.pending_file, 'wb') as f:
+            f.write(_to_json(signal, indent=True))
+    
+    def load_cached_data(self):
+        """Return the cached Yahoo Finance history if it is fresh, else None."""
+        if not self.yf_cache.exists():
+            return None
+        if time.time() - self.yf_cache.stat().st_mtime >= self.CACHE_TTL:
+            return None
+        try:
+            return pd.read_parquet(self.yf_cache)
+        except Exception:  # No parquet engine, or an unreadable file
+            return None
     
-    def save_signal_log(self):
-        """Save signal history."""
-        with open(self.signal_log, 'w') as f:
-            json.dump(self.signals, f, indent=2, default=str)
+    def save_cached_data(self, data):
+        """
+        Cache a fetched history. The cache is optional: without a parquet
+        engine, or if the file cannot be written, it is simply skipped.
+        """
+        try:
+            self.data_path.mkdir(exist_ok=True)
+            data.to_parquet(self.yf_cache)
+        except Exception:  # No parquet engine, an unwritable path or an unsupported column
+            pass
     
-    def fetch_live_data(self):
-        """Fetch live XAU/USD data from free sources."""
+    def fetch_yahoo(self, tickers):
+        """
+        Daily history of several Yahoo Finance tickers in one batched request.
+        
+        Returns ``{ticker: DataFrame}`` with lower-case OHLCV columns;
+        tickers that came back empty are left out.
+        """
+        import yfinance as yf
+        raw = yf.download(tickers, period="3mo", interval="1d", group_by='ticker',
+                          auto_adjust=True, threads=True, progress=False)
+        
+        frames = {}
+        for ticker in tickers:
+            # Columns are (ticker, field) pairs, except for a single ticker
+            # on older yfinance versions
+            df = raw[ticker] if isinstance(raw.columns, pd.MultiIndex) else raw
+            df = df.dropna(how='all')
+            if len(df) > 0:
+                frames[ticker] = df.rename(columns={
+                    'Open': 'open', 'High': 'high', 
+                    'Low': 'low', 'Close': 'close', 'Volume': 'volume'
+                })
+        return frames
+    
+    def fetch_live_data(self, tickers=None):
+        """
+        Fetch live XAU/USD data from free sources.
+        
+        ``tickers`` (default ``TICKERS``) are downloaded together and kept
+        in ``self.market_data``; the history of the first one is returned.
+        The local cache holds that first history only.
+        """
+        tickers = list(tickers or self.TICKERS)
+        self.market_data = {}
         
         print("📡 Fetching live data...")
         
         # Try multiple free data sources
-        data = None
+        data = self.load_cached_data()
+        if data is not None:
+            print("   ✅ Data from Yahoo Finance (cached)")
+            self.market_data[tickers[0]] = data
+            return data
         
         # Method 1: Try Yahoo Finance (yfinance)
         try:
-            import yfinance as yf
-            ticker = yf.Ticker("GC=F")  # Gold futures
-            data = ticker.history(period="3mo", interval="1d")
-            if len(data) > 0:
-                data = data.rename(columns={
-                    'Open': 'open', 'High': 'high', 
-                    'Low': 'low', 'Close': 'close', 'Volume': 'volume'
-                })
+            self.market_data = self.fetch_yahoo(tickers)
+            data = self.market_data.get(tickers[0])
+            if data is not None:
                 print("   ✅ Data from Yahoo Finance")
+                self.save_cached_data(data)
                 return data
         except Exception as e:
             print(f"   ⚠️ Yahoo Finance: {e}")
@@ -86,21 +197,26 @@ class LiveSignalGenerator:
             days_to_add = (today - last_date).days
             
             if days_to_add > 0:
-                np.random.seed(42)  # Reproducible
-                for i in range(min(days_to_add, 30)):
-                    new_date = last_date + timedelta(days=i+1)
-                    if new_date.weekday() < 5:  # Skip weekends
-                        change = np.random.normal(0, last_price * 0.01)
-                        new_price = last_price + change
-                        new_row = pd.DataFrame({
-                            'open': [new_price - np.random.uniform(0, 20)],
-                            'high': [new_price + np.random.uniform(5, 25)],
-                            'low': [new_price - np.random.uniform(5, 25)],
-                            'close': [new_price],
-                            'volume': [np.random.randint(50000, 150000)]
-                        }, index=[new_date])
-                        data = pd.concat([data, new_row])
-                        last_price = new_price
+                # Business days only: weekends are skipped
+                new_dates = pd.bdate_range(start=last_date + pd.Timedelta(days=1),
+                                           end=last_date + pd.Timedelta(days=min(days_to_add, 30)),
+                                           normalize=False)
+                n = len(new_dates)
+                
+                # Draw every simulated day at once (seeded, so reproducible).
+                # Each day moves by N(0, 1%) of the previous close, which
+                # compounds into a cumulative product.
+                rng = np.random.default_rng(42)
+                closes = last_price * np.cumprod(1 + rng.normal(0, 0.01, size=n))
+                new_rows = pd.DataFrame({
+                    'open': closes - rng.uniform(0, 20, size=n),
+                    'high': closes + rng.uniform(5, 25, size=n),
+                    'low': closes - rng.uniform(5, 25, size=n),
+                    'close': closes,
+                    'volume': rng.integers(50000, 150000, size=n)
+                }, index=new_dates)
+                if n > 0:
+                    data = pd.concat([data, new_rows])
             
             return data
         
@@ -110,10 +226,11 @@ class LiveSignalGenerator:
         """Calculate all indicators."""
         df = data.copy()
         
-        # EMAs
-        df['ema_3'] = ta.trend.ema_indicator(df['close'], window=3)
-        df['ema_8'] = ta.trend.ema_indicator(df['close'], window=8)
-        df['ema_21'] = ta.trend.ema_indicator(df['close'], window=21)
+        # EMAs (array kernel, same values as ta.trend.ema_indicator)
+        close = df['close'].to_numpy(dtype=np.float64)
+        df['ema_3'] = kernels.ema(close, 3)
+        df['ema_8'] = kernels.ema(close, 8)
+        df['ema_21'] = kernels.ema(close, 21)
         
         # RSI
         df['rsi'] = ta.momentum.rsi(df['close'], window=5)
@@ -135,20 +252,12 @@ class LiveSignalGenerator:
             return None
         
         i = len(data) - 1
-        
-        close = data['close'].iloc[i]
-        atr = data['atr'].iloc[i]
-        ema_3 = data['ema_3'].iloc[i]
-        ema_8 = data['ema_8'].iloc[i]
-        rsi = data['rsi'].iloc[i]
-        macd = data['macd'].iloc[i]
-        macd_sig = data['macd_signal'].iloc[i]
-        
-        prev_ema_3 = data['ema_3'].iloc[i-1]
-        prev_ema_8 = data['ema_8'].iloc[i-1]
-        prev_macd = data['macd'].iloc[i-1]
-        prev_macd_sig = data['macd_signal'].iloc[i-1]
-        prev_close = data['close'].iloc[i-1]
+        # Only the last two bars are read: pull them out as one small
+        # float array and unpack into locals
+        cols = ['close', 'atr', 'ema_3', 'ema_8', 'rsi', 'macd', 'macd_signal']
+        prev, cur = data.iloc[-2:][cols].to_numpy(dtype=np.float64)
+        close, atr, ema_3, ema_8, rsi, macd, macd_sig = cur
+        prev_close, _, prev_ema_3, prev_ema_8, _, prev_macd, prev_macd_sig = prev
         
         signals = []
         
@@ -184,12 +293,10 @@ class LiveSignalGenerator:
         else:
             return None  # Conflicting signals
         
-        if direction == 'LONG':
-            sl = close - atr * self.ATR_SL
-            tp = close + atr * self.ATR_TP
-        else:
-            sl = close + atr * self.ATR_SL
-            tp = close - atr * self.ATR_TP
+        # Stop below / target above the entry for a long, mirrored for a short
+        sign = 1.0 if direction == 'LONG' else -1.0
+        sl = close - sign * atr * self.ATR_SL
+        tp = close + sign * atr * self.ATR_TP
         
         return {
             'date': data.index[i].isoformat(),
@@ -274,15 +381,14 @@ class LiveSignalGenerator:
             print(f"\n📐 POSITION SIZING")
             print("-" * 50)
             
-            for account in [10000, 25000, 50000, 100000]:
-                pos = self.calculate_position_size(signal, account)
+            sizing = {account: self.calculate_position_size(signal, account)
+                      for account in [10000, 25000, 50000, 100000]}
+            for account, pos in sizing.items():
                 print(f"   ${account:,}: {pos['position_lots']:.2f} lots ({pos['position_size_oz']:.0f} oz) | Risk ${pos['risk_amount']:.0f}")
             
             # Log signal
             signal['generated_at'] = datetime.now().isoformat()
-            self.signals['history'].append(signal)
-            self.signals['pending'] = signal
-            self.save_signal_log()
+            self.save_signal_log(signal)
             
             print(f"\n✅ Signal logged to {self.signal_log}")
             
@@ -301,8 +407,8 @@ class LiveSignalGenerator:
        - Take Profit: ${signal['take_profit']:.2f}
     
     3. For $10,000 account:
-       - Position:   {self.calculate_position_size(signal, 10000)['position_lots']:.2f} lots
-       - Risk:       8% (${self.calculate_position_size(signal, 10000)['risk_amount']:.0f})
+       - Position:   {sizing[10000]['position_lots']:.2f} lots
+       - Risk:       8% (${sizing[10000]['risk_amount']:.0f})
     
     4. Management:
        - Move stop to breakeven at +1 ATR (${signal['atr']:.2f})
@@ -8,17 +8,31 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 from itertools import product
-import ta
+from concurrent.futures import ProcessPoolExecutor
+
+from src.analysis import kernels
+from src.strategy.final_kernel import EXIT_REASONS, TRADE_DTYPE, fill_atr, final_loop
+from src.utils.soa import to_soa
 
 
 class OptimizedEMAStrategy:
     """EMA Crossover with optimizable parameters."""
     
+    # A run whose capital falls below this fraction of the initial capital
+    # is ruined and stops trading; the grid search skips its remaining bars
+    ruin_fraction = 0.1
+    
     def __init__(self, data, initial_capital=10000, 
                  fast_ema=8, slow_ema=21, trend_ema=55,
-                 risk_per_trade=0.02, sl_mult=2.0, tp_mult=4.0, trail_mult=1.5):
-        
-        self.data = data.copy()
+                 risk_per_trade=0.02, sl_mult=2.0, tp_mult=4.0, trail_mult=1.5,
+                 indicators=None):
+        """
+        ``indicators`` may be a dict from ``precompute_indicators`` covering
+        this strategy's EMA windows; it is reused instead of recomputing.
+        Neither ``data`` nor ``indicators`` is copied or modified, so a grid
+        search can share them across every strategy.
+        """
+        self.data = data
         self.initial_capital = initial_capital
         self.fast_ema = fast_ema
         self.slow_ema = slow_ema
@@ -28,219 +42,144 @@ class OptimizedEMAStrategy:
         self.tp_mult = tp_mult
         self.trail_mult = trail_mult
         
-        self.positions = pd.Series(index=data.index, data=0.0)
-        self.capital = pd.Series(index=data.index, data=0.0)
-        self.trades = []
+        # Per-bar signed position and equity, written in place by the loop
+        self.positions = np.zeros(len(data))
+        self.capital = np.zeros(len(data))
+        # Closed trades as TRADE_DTYPE records (one array per field); the
+        # ``trades`` table is only built when asked for.
+        self.trade_records = np.empty(0, dtype=TRADE_DTYPE)
         
-        self._calculate_indicators()
+        self._calculate_indicators(indicators)
     
-    def _calculate_indicators(self):
-        self.data['ema_fast'] = ta.trend.ema_indicator(self.data['close'], window=self.fast_ema)
-        self.data['ema_slow'] = ta.trend.ema_indicator(self.data['close'], window=self.slow_ema)
-        self.data['ema_trend'] = ta.trend.ema_indicator(self.data['close'], window=self.trend_ema)
-        self.data['atr'] = ta.volatility.average_true_range(
-            self.data['high'], self.data['low'], self.data['close'], window=14
-        )
-        self.data['rsi'] = ta.momentum.rsi(self.data['close'], window=14)
+    @property
+    def trades(self):
+        records = self.trade_records
+        return pd.DataFrame({
+            'entry_date': self.data.index[records['entry_i']],
+            'entry_price': records['entry_price'],
+            'side': np.where(records['side'] > 0, 'long', 'short'),
+            'size': records['size'],
+            'exit_price': records['exit_price'],
+            'exit_reason': np.array(EXIT_REASONS)[records['reason']],
+            'pnl': records['pnl'],
+        })
+    
+    @staticmethod
+    def precompute_indicators(data, ema_windows):
+        """
+        Indicators for every strategy in a parameter sweep over ``data``.
         
-        self.data['cross_up'] = (
-            (self.data['ema_fast'] > self.data['ema_slow']) & 
-            (self.data['ema_fast'].shift(1) <= self.data['ema_slow'].shift(1))
-        )
-        self.data['cross_down'] = (
-            (self.data['ema_fast'] < self.data['ema_slow']) &
-            (self.data['ema_fast'].shift(1) >= self.data['ema_slow'].shift(1))
+        ATR and RSI do not depend on the parameters and each EMA only on
+        its window, so a grid search computes them once and hands the
+        dict to every strategy. Returns ``{'atr', 'rsi', 'ema_<window>'}``
+        arrays.
+        """
+        close = data['close'].to_numpy(dtype=np.float64)
+        high = data['high'].to_numpy(dtype=np.float64)
+        low = data['low'].to_numpy(dtype=np.float64)
+        
+        # Array kernels reproduce the ta indicators; the ATR warm-up is
+        # filled here once instead of being checked on every bar
+        indicators = {
+            'atr': fill_atr(kernels.atr(high, low, close, 14), close),
+            'rsi': kernels.rsi(close, 14),
+        }
+        for window in ema_windows:
+            indicators[f'ema_{window}'] = kernels.ema(close, window)
+        return indicators
+    
+    def _calculate_indicators(self, indicators=None):
+        if indicators is None:
+            indicators = self.precompute_indicators(
+                self.data, {self.fast_ema, self.slow_ema, self.trend_ema}
+            )
+        # Price columns are read through array views; only the crossovers
+        # depend on this strategy's pair of windows and are built here.
+        self.arrays = to_soa(self.data, ['close', 'high', 'low'], dtype=np.float64)
+        self.arrays['ema_trend'] = indicators[f'ema_{self.trend_ema}']
+        self.arrays['atr'] = indicators['atr']
+        self.arrays['rsi'] = indicators['rsi']
+        self.arrays['cross_up'], self.arrays['cross_down'] = kernels.crossovers(
+            indicators[f'ema_{self.fast_ema}'], indicators[f'ema_{self.slow_ema}']
         )
     
     def backtest(self):
-        capital = self.initial_capital
-        position = 0
-        entry_price = 0
-        stop_loss = 0
-        take_profit = 0
-        highest = 0
-        lowest = float('inf')
-        
-        self.trades = []
-        current_trade = None
-        
+        # Same long/short EMA-crossover loop as FinalStrategy; the compiled
+        # kernel reads the indicators as plain arrays.
+        arrays = self.arrays
         min_idx = max(60, self.trend_ema + 10)
         
-        for i in range(len(self.data)):
-            if i < min_idx:
-                self.capital.iloc[i] = capital
-                self.positions.iloc[i] = 0
-                continue
-            
-            close = self.data['close'].iloc[i]
-            high = self.data['high'].iloc[i]
-            low = self.data['low'].iloc[i]
-            atr = self.data['atr'].iloc[i]
-            ema_trend = self.data['ema_trend'].iloc[i]
-            rsi = self.data['rsi'].iloc[i]
-            
-            if pd.isna(atr) or atr <= 0:
-                atr = close * 0.01
-            
-            # Long position management
-            if position > 0:
-                highest = max(highest, high)
-                trail = highest - atr * self.trail_mult
-                eff_stop = max(stop_loss, trail)
-                
-                if low <= eff_stop:
-                    pnl = (eff_stop - entry_price) * position
-                    capital += pnl
-                    if current_trade:
-                        current_trade['exit_price'] = eff_stop
-                        current_trade['exit_reason'] = 'stop'
-                        current_trade['pnl'] = pnl
-                        self.trades.append(current_trade)
-                    position = 0
-                    current_trade = None
-                elif high >= take_profit:
-                    pnl = (take_profit - entry_price) * position
-                    capital += pnl
-                    if current_trade:
-                        current_trade['exit_price'] = take_profit
-                        current_trade['exit_reason'] = 'take_profit'
-                        current_trade['pnl'] = pnl
-                        self.trades.append(current_trade)
-                    position = 0
-                    current_trade = None
-                elif self.data['cross_down'].iloc[i]:
-                    pnl = (close - entry_price) * position
-                    capital += pnl
-                    if current_trade:
-                        current_trade['exit_price'] = close
-                        current_trade['exit_reason'] = 'signal'
-                        current_trade['pnl'] = pnl
-                        self.trades.append(current_trade)
-                    position = 0
-                    current_trade = None
-            
-            # Short position management
-            elif position < 0:
-                lowest = min(lowest, low)
-                trail = lowest + atr * self.trail_mult
-                eff_stop = min(stop_loss, trail)
-                
-                if high >= eff_stop:
-                    pnl = (entry_price - eff_stop) * abs(position)
-                    capital += pnl
-                    if current_trade:
-                        current_trade['exit_price'] = eff_stop
-                        current_trade['exit_reason'] = 'stop'
-                        current_trade['pnl'] = pnl
-                        self.trades.append(current_trade)
-                    position = 0
-                    current_trade = None
-                elif low <= take_profit:
-                    pnl = (entry_price - take_profit) * abs(position)
-                    capital += pnl
-                    if current_trade:
-                        current_trade['exit_price'] = take_profit
-                        current_trade['exit_reason'] = 'take_profit'
-                        current_trade['pnl'] = pnl
-                        self.trades.append(current_trade)
-                    position = 0
-                    current_trade = None
-                elif self.data['cross_up'].iloc[i]:
-                    pnl = (entry_price - close) * abs(position)
-                    capital += pnl
-                    if current_trade:
-                        current_trade['exit_price'] = close
-                        current_trade['exit_reason'] = 'signal'
-                        current_trade['pnl'] = pnl
-                        self.trades.append(current_trade)
-                    position = 0
-                    current_trade = None
-            
-            # Entry
-            if position == 0:
-                signal = 0
-                if self.data['cross_up'].iloc[i] and close > ema_trend and rsi < 70:
-                    signal = 1
-                elif self.data['cross_down'].iloc[i] and close < ema_trend and rsi > 30:
-                    signal = -1
-                
-                if signal != 0:
-                    if signal == 1:
-                        stop_loss = close - atr * self.sl_mult
-                        take_profit = close + atr * self.tp_mult
-                        risk = close - stop_loss
-                    else:
-                        stop_loss = close + atr * self.sl_mult
-                        take_profit = close - atr * self.tp_mult
-                        risk = stop_loss - close
-                    
-                    if risk > 0:
-                        size = (capital * self.risk_per_trade) / risk
-                        max_size = (capital * 0.1) / close
-                        size = min(size, max_size)
-                        
-                        position = size if signal > 0 else -size
-                        entry_price = close
-                        highest = close
-                        lowest = close
-                        
-                        current_trade = {
-                            'entry_date': self.data.index[i],
-                            'entry_price': entry_price,
-                            'side': 'long' if signal > 0 else 'short',
-                            'size': abs(position)
-                        }
-            
-            self.positions.iloc[i] = position
-            unrealized = (close - entry_price) * position if position != 0 else 0
-            self.capital.iloc[i] = capital + unrealized
+        self.capital[:min_idx] = self.initial_capital  # Flat during the warm-up
+        capital, records = final_loop(
+            arrays['close'], arrays['high'], arrays['low'], arrays['atr'],
+            arrays['ema_trend'], arrays['rsi'], arrays['cross_up'], arrays['cross_down'],
+            min_idx, float(self.initial_capital), self.risk_per_trade,
+            self.sl_mult, self.tp_mult, self.trail_mult, 0.1,
+            self.initial_capital * self.ruin_fraction, self.positions, self.capital
+        )
         
-        # Close remaining
-        if position != 0:
-            close = self.data['close'].iloc[-1]
-            pnl = (close - entry_price) * position if position > 0 else (entry_price - close) * abs(position)
-            capital += pnl
-            if current_trade:
-                current_trade['exit_price'] = close
-                current_trade['exit_reason'] = 'end'
-                current_trade['pnl'] = pnl
-                self.trades.append(current_trade)
+        self.trade_records = records
         
         return self._metrics(capital)
     
     def _metrics(self, final):
+        pnl = self.trade_records['pnl']
         m = {
             'return_pct': ((final - self.initial_capital) / self.initial_capital) * 100,
-            'trades': len(self.trades),
+            'trades': len(pnl),
             'win_rate': 0,
             'profit_factor': 0,
             'rr_ratio': 0,
             'max_dd': 0
         }
         
-        if self.trades:
-            df = pd.DataFrame(self.trades)
-            winners = df[df['pnl'] > 0]
-            losers = df[df['pnl'] < 0]
-            m['win_rate'] = len(winners) / len(df) * 100
-            m['avg_win'] = winners['pnl'].mean() if len(winners) > 0 else 0
-            m['avg_loss'] = abs(losers['pnl'].mean()) if len(losers) > 0 else 0
+        if len(pnl):
+            winners = pnl[pnl > 0]
+            losers = pnl[pnl < 0]
+            m['win_rate'] = len(winners) / len(pnl) * 100
+            m['avg_win'] = winners.mean() if len(winners) > 0 else 0
+            m['avg_loss'] = abs(losers.mean()) if len(losers) > 0 else 0
             if m['avg_loss'] > 0:
                 m['rr_ratio'] = m['avg_win'] / m['avg_loss']
-            gp = winners['pnl'].sum() if len(winners) > 0 else 0
-            gl = abs(losers['pnl'].sum()) if len(losers) > 0 else 0
+            gp = winners.sum() if len(winners) > 0 else 0
+            gl = abs(losers.sum()) if len(losers) > 0 else 0
             if gl > 0:
                 m['profit_factor'] = gp / gl
             
-            equity = self.capital.dropna()
+            equity = self.capital
             if len(equity) > 0:
-                rm = equity.expanding().max()
+                rm = np.maximum.accumulate(equity)
                 dd = (equity - rm) / rm
                 m['max_dd'] = abs(dd.min()) * 100
         
         return m
 
 
+def _init_worker(data, indicators):
+    global _worker_data, _worker_indicators
+    _worker_data = data
+    _worker_indicators = indicators
+
+
+def _evaluate_params(fast, slow, trend, sl, tp, trail):
+    """Backtest one parameter combination; None if it fails or trades too little."""
+    try:
+        s = OptimizedEMAStrategy(_worker_data, fast_ema=fast, slow_ema=slow, trend_ema=trend,
+                                 sl_mult=sl, tp_mult=tp, trail_mult=trail,
+                                 indicators=_worker_indicators)
+        m = s.backtest()
+    except:
+        return None
+    
+    if m['trades'] < 10:  # Minimum trades
+        return None
+    return {
+        'fast': fast, 'slow': slow, 'trend': trend,
+        'sl': sl, 'tp': tp, 'trail': trail,
+        **m
+    }
+
+
 def main():
     data = pd.read_csv(Path("data") / "XAU_USD_1D_sample.csv", index_col=0, parse_dates=True)
     
@@ -256,34 +195,39 @@ def main():
     tp_mults = [3.0, 4.0, 5.0]
     trail_mults = [1.0, 1.5, 2.0]
     
-    results = []
     total = len(fast_emas) * len(slow_emas) * len(trend_emas) * len(sl_mults) * len(tp_mults) * len(trail_mults)
-    print(f"Testing {total} combinations...")
     
-    for fast, slow, trend, sl, tp, trail in product(fast_emas, slow_emas, trend_emas, sl_mults, tp_mults, trail_mults):
-        if fast >= slow:
-            continue
-        
-        try:
-            s = OptimizedEMAStrategy(data, fast_ema=fast, slow_ema=slow, trend_ema=trend,
-                                     sl_mult=sl, tp_mult=tp, trail_mult=trail)
-            m = s.backtest()
-            
-            if m['trades'] >= 10:  # Minimum trades
-                results.append({
-                    'fast': fast, 'slow': slow, 'trend': trend,
-                    'sl': sl, 'tp': tp, 'trail': trail,
-                    **m
-                })
-        except:
-            pass
+    # Every combination is an independent backtest, so fan them out across
+    # processes; map() returns them in grid order.
+    combos = [
+        (fast, slow, trend, sl, tp, trail)
+        for fast, slow, trend, sl, tp, trail
+        in product(fast_emas, slow_emas, trend_emas, sl_mults, tp_mults, trail_mults)
+        # Skip structurally poor combinations before backtesting them: the
+        # fast EMA must be faster than the slow one and the trend filter
+        # slower, the target must be further away than the stop, and the
+        # trailing stop no wider than the initial one.
+        if fast < slow < trend and tp > sl and trail <= sl
+    ]
+    print(f"Testing {len(combos)} combinations ({total - len(combos)} pruned)...")
+    # ATR, RSI and each EMA window are shared by many combinations:
+    # compute them once up front rather than per backtest.
+    indicators = OptimizedEMAStrategy.precompute_indicators(
+        data, set(fast_emas) | set(slow_emas) | set(trend_emas)
+    )
+    with ProcessPoolExecutor(initializer=_init_worker, initargs=(data, indicators)) as executor:
+        evaluated = executor.map(
+            _evaluate_params, *zip(*combos),
+            chunksize=max(1, len(combos) // (4 * (os.cpu_count() or 1)))
+        )
+        results = [r for r in evaluated if r is not None]
     
     if not results:
         print("No valid results!")
         return
     
     df = pd.DataFrame(results)
-    df = df.sort_values('return_pct', ascending=False)
+    df = df.sort_values('return_pct', ascending=False, kind='stable')
     
     print(f"\n{'TOP 10 PARAMETER COMBINATIONS':=^70}")
     print("-" * 70)
@@ -2,19 +2,60 @@
 
 import sys
 import os
+import argparse
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import pandas as pd
 import numpy as np
 from pathlib import Path
 from itertools import product
+from src.data.loader import load_ohlcv
+from src.strategy.final_kernel import SWEEP_FIELDS
 from src.strategy.working_strategy import WorkingStrategy
 
 
-def main():
+def _result_row(risk, sl, tp, trail, cell):
+    """Result row of one ``param_sweep`` cell; None if it traded too little."""
+    stats = dict(zip(SWEEP_FIELDS, cell))
+    trades = int(stats['trades'])
+    if trades < 5:  # Minimum trades
+        return None
+    
+    wins, losses = stats['wins'], stats['losses']
+    gross_profit, gross_loss = stats['gross_profit'], stats['gross_loss']
+    avg_win = gross_profit / wins if wins > 0 else 0
+    avg_loss = gross_loss / losses if losses > 0 else 0
+    if gross_loss > 0:
+        profit_factor = gross_profit / gross_loss
+    else:
+        profit_factor = float('inf') if gross_profit > 0 else 0
+    
+    return {
+        'risk': risk,
+        'sl_mult': sl,
+        'tp_mult': tp,
+        'trail_mult': trail,
+        'return_pct': ((stats['capital'] - 10000) / 10000) * 100,
+        'win_rate': wins / trades * 100,
+        'trades': trades,
+        'profit_factor': profit_factor,
+        'rr_ratio': avg_win / avg_loss if avg_loss > 0 else 0,
+        'max_dd': stats['max_dd'] * 100,
+        'sharpe': stats['sharpe']
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--prune', action='store_true',
+        help="skip larger stop-loss multiples once a smaller one (same risk, TP and "
+             "trail) traded fewer than the minimum number of trades"
+    )
+    args = parser.parse_args(argv)
+    
     # Load data
-    data_path = Path("data") / "XAU_USD_1D_sample.csv"
-    data = pd.read_csv(data_path, index_col=0, parse_dates=True)
+    data = load_ohlcv(Path("data") / "XAU_USD_1D_sample.csv")
     
     print("=" * 70)
     print("PARAMETER OPTIMIZATION")
@@ -23,8 +64,8 @@ def main():
     
     # Split data: 70% training, 30% validation
     split_idx = int(len(data) * 0.7)
-    train_data = data.iloc[:split_idx].copy()
-    test_data = data.iloc[split_idx:].copy()
+    train_data = data.iloc[:split_idx]
+    test_data = data.iloc[split_idx:]
     
     print(f"Training: {len(train_data)} bars")
     print(f"Testing: {len(test_data)} bars")
@@ -35,43 +76,35 @@ def main():
     tp_mults = [3.0, 4.0, 5.0, 6.0]
     trail_mults = [1.0, 1.5, 2.0]
     
-    results = []
     total = len(risk_levels) * len(sl_mults) * len(tp_mults) * len(trail_mults)
     
     print(f"\nTesting {total} parameter combinations...")
     
-    for risk, sl, tp, trail in product(risk_levels, sl_mults, tp_mults, trail_mults):
-        # Skip invalid combinations (TP must be > SL for positive expectancy)
+    # Every combination runs in one compiled, threaded sweep over the
+    # training arrays; cells with TP <= SL are skipped (NaN) since TP must
+    # be > SL for positive expectancy.
+    # With --prune, SL values (in increasing order) after one that fell
+    # under the minimum trade count are not run and are NaN as well.
+    grid = WorkingStrategy.sweep(train_data, risk_levels, sl_mults, tp_mults, trail_mults,
+                                 initial_capital=10000, min_trades=5 if args.prune else 0)
+    
+    # Rows in grid order (the order of product())
+    results = []
+    pruned = 0
+    for (i, risk), (j, sl), (k, tp), (m, trail) in product(
+            enumerate(risk_levels), enumerate(sl_mults), enumerate(tp_mults), enumerate(trail_mults)):
         if tp <= sl:
             continue
-        
-        try:
-            strategy = WorkingStrategy(
-                train_data.copy(),
-                initial_capital=10000,
-                risk_per_trade=risk,
-                sl_atr_mult=sl,
-                tp_atr_mult=tp,
-                trail_atr_mult=trail
-            )
-            metrics = strategy.backtest()
-            
-            if metrics['total_trades'] >= 5:  # Minimum trades
-                results.append({
-                    'risk': risk,
-                    'sl_mult': sl,
-                    'tp_mult': tp,
-                    'trail_mult': trail,
-                    'return_pct': metrics['total_return_pct'],
-                    'win_rate': metrics['win_rate_pct'],
-                    'trades': metrics['total_trades'],
-                    'profit_factor': metrics['profit_factor'],
-                    'rr_ratio': metrics['risk_reward_ratio'],
-                    'max_dd': metrics['max_drawdown_pct'],
-                    'sharpe': metrics['sharpe_ratio']
-                })
-        except Exception as e:
-            pass
+        cell = grid[i, j, k, m]
+        if np.isnan(cell[0]):
+            pruned += 1
+            continue
+        row = _result_row(risk, sl, tp, trail, cell)
+        if row is not None:
+            results.append(row)
+    
+    if args.prune:
+        print(f"Pruned {pruned} dominated combinations")
     
     if not results:
         print("No valid results!")
@@ -104,7 +137,7 @@ def main():
     print(f"\n{'OUT-OF-SAMPLE VALIDATION':=^70}")
     
     strategy = WorkingStrategy(
-        test_data.copy(),
+        test_data,
         initial_capital=10000,
         risk_per_trade=best['risk'],
         sl_atr_mult=best['sl_mult'],
@@ -124,7 +157,7 @@ def main():
     print(f"\n{'FULL DATA RESULTS':=^70}")
     
     strategy = WorkingStrategy(
-        data.copy(),
+        data,
         initial_capital=10000,
         risk_per_trade=best['risk'],
         sl_atr_mult=best['sl_mult'],
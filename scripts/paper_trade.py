@@ -9,65 +9,129 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-import pandas as pd
 import numpy as np
 from pathlib import Path
 from datetime import datetime
 import json
-import ta
+
+from src.analysis.signal_indicators import (INDICATOR_COLUMNS, add_signal_indicators,
+                                            load_signal_indicators)
+
+
+# The journal's small mutable state is rewritten on each save; closed
+# trades are only ever appended, one JSON object per line
+STATE_PATH = Path("data") / "paper_state.json"
+TRADES_PATH = Path("data") / "paper_trades.ndjson"
+# Single-file journal written by earlier versions
+LEGACY_JOURNAL_PATH = Path("data") / "paper_trades.json"
 
 
 def load_trade_journal():
     """Load or create trade journal."""
-    journal_path = Path("data") / "paper_trades.json"
-    if journal_path.exists():
-        with open(journal_path, 'r') as f:
-            return json.load(f)
+    if not STATE_PATH.exists() and LEGACY_JOURNAL_PATH.exists():
+        migrate_legacy_journal()
+    
+    if STATE_PATH.exists():
+        with open(STATE_PATH, 'r') as f:
+            state = json.load(f)
+    else:
+        state = {
+            'current_position': None,
+            'paper_capital': 10000,
+            'start_date': datetime.now().isoformat(),
+            **trade_stats([])
+        }
+    
+    trades = []
+    if TRADES_PATH.exists():
+        with open(TRADES_PATH, 'r') as f:
+            trades = [json.loads(line) for line in f if line.strip()]
+    journal = {'trades': trades, **state}
+    if 'wins' not in journal:  # Journal from before the running totals
+        journal.update(trade_stats(trades))
+    return journal
+
+
+def migrate_legacy_journal():
+    """
+    Split a ``paper_trades.json`` journal into the state file and the
+    trade log. The old file is left in place; it is not read again once
+    the state file exists.
+    """
+    with open(LEGACY_JOURNAL_PATH, 'r') as f:
+        journal = json.load(f)
+    
+    trades = journal.pop('trades', [])
+    with open(TRADES_PATH, 'w') as f:
+        f.writelines(json.dumps(trade, default=str) + '\n' for trade in trades)
+    save_trade_journal({**journal, **trade_stats(trades)})
+
+
+def trade_stats(trades):
+    """Win/loss counts and gross profit/loss of a list of closed trades."""
+    # One pass over the dicts into a float array, then vectorised totals
+    pnl = np.fromiter((t['pnl'] for t in trades), dtype=np.float64, count=len(trades))
+    winners = pnl > 0
+    losers = pnl < 0
     return {
-        'trades': [],
-        'current_position': None,
-        'paper_capital': 10000,
-        'start_date': datetime.now().isoformat()
+        'wins': int(np.count_nonzero(winners)),
+        'losses': int(np.count_nonzero(losers)),
+        'gross_profit': float(pnl[winners].sum()),
+        'gross_loss': float((-pnl[losers]).sum())
     }
 
 
 def save_trade_journal(journal):
-    """Save trade journal."""
-    journal_path = Path("data") / "paper_trades.json"
-    with open(journal_path, 'w') as f:
-        json.dump(journal, f, indent=2, default=str)
+    """
+    Save the journal state (closed trades are saved by ``record_trade``).
+    
+    Call this right after closing a trade, so the state file never shows
+    a position as open once its trade is in the trade log.
+    """
+    state = {key: value for key, value in journal.items() if key != 'trades'}
+    with open(STATE_PATH, 'w') as f:
+        json.dump(state, f, indent=2, default=str)
+
+
+def record_trade(journal, trade):
+    """
+    Add a closed trade to the journal and append it to the trade log.
+    
+    The journal's running totals (see ``trade_stats``) are updated here,
+    so the dashboard never rescans the trade history.
+    """
+    journal['trades'].append(trade)
+    pnl = trade['pnl']
+    if pnl > 0:
+        journal['wins'] += 1
+        journal['gross_profit'] += pnl
+    elif pnl < 0:
+        journal['losses'] += 1
+        journal['gross_loss'] -= pnl
+    with open(TRADES_PATH, 'a') as f:
+        f.write(json.dumps(trade, default=str) + "\n")
 
 
 def get_current_signal(data):
-    """Get the current trading signal."""
-    # Calculate indicators
-    data = data.copy()
-    data['ema_5'] = ta.trend.ema_indicator(data['close'], window=5)
-    data['ema_21'] = ta.trend.ema_indicator(data['close'], window=21)
-    data['ema_55'] = ta.trend.ema_indicator(data['close'], window=55)
-    data['atr'] = ta.volatility.average_true_range(
-        data['high'], data['low'], data['close'], window=14
-    )
-    data['rsi'] = ta.momentum.rsi(data['close'], window=14)
+    """
+    Get the current trading signal.
+    
+    ``data`` may be raw OHLC or already carry the indicator columns (as
+    returned by ``load_signal_indicators``), in which case it is used as is.
+    """
+    if not all(col in data.columns for col in INDICATOR_COLUMNS):
+        data = add_signal_indicators(data)
     
     # Get latest values
     latest = data.iloc[-1]
-    prev = data.iloc[-2]
     
+    cross_up = latest['cross_up']
+    cross_down = latest['cross_down']
     close = latest['close']
-    ema_5 = latest['ema_5']
-    ema_21 = latest['ema_21']
     ema_55 = latest['ema_55']
     atr = latest['atr']
     rsi = latest['rsi']
     
-    prev_ema_5 = prev['ema_5']
-    prev_ema_21 = prev['ema_21']
-    
-    # Check for crossover
-    cross_up = ema_5 > ema_21 and prev_ema_5 <= prev_ema_21
-    cross_down = ema_5 < ema_21 and prev_ema_5 >= prev_ema_21
-    
     signal = None
     
     if cross_up and close > ema_55 and rsi < 70:
@@ -95,63 +159,66 @@ def get_current_signal(data):
 def display_dashboard(journal, data, signal):
     """Display paper trading dashboard."""
     latest = data.iloc[-1]
+    out = []
     
-    print("\n" + "=" * 70)
-    print("📊 PAPER TRADING DASHBOARD")
-    print("=" * 70)
+    out.append("\n" + "=" * 70)
+    out.append("📊 PAPER TRADING DASHBOARD")
+    out.append("=" * 70)
     
     # Account summary
-    print(f"\n💰 PAPER ACCOUNT")
-    print(f"   Starting Capital:  ${10000:,.2f}")
-    print(f"   Current Capital:   ${journal['paper_capital']:,.2f}")
+    out.append(f"\n💰 PAPER ACCOUNT")
+    out.append(f"   Starting Capital:  ${10000:,.2f}")
+    out.append(f"   Current Capital:   ${journal['paper_capital']:,.2f}")
     pnl = journal['paper_capital'] - 10000
-    print(f"   Total P/L:         ${pnl:+,.2f} ({pnl/100:+.2f}%)")
-    print(f"   Total Trades:      {len(journal['trades'])}")
+    out.append(f"   Total P/L:         ${pnl:+,.2f} ({pnl/100:+.2f}%)")
+    out.append(f"   Total Trades:      {len(journal['trades'])}")
     
     if journal['trades']:
-        winners = [t for t in journal['trades'] if t['pnl'] > 0]
-        print(f"   Win Rate:          {len(winners)/len(journal['trades'])*100:.1f}%")
+        out.append(f"   Win Rate:          {journal['wins']/len(journal['trades'])*100:.1f}%")
     
     # Current position
-    print(f"\n📍 CURRENT POSITION")
+    out.append(f"\n📍 CURRENT POSITION")
     if journal['current_position']:
         pos = journal['current_position']
-        print(f"   Direction: {pos['direction']}")
-        print(f"   Entry:     ${pos['entry']:.2f}")
-        print(f"   Stop Loss: ${pos['stop_loss']:.2f}")
-        print(f"   Take Profit: ${pos['take_profit']:.2f}")
+        out.append(f"   Direction: {pos['direction']}")
+        out.append(f"   Entry:     ${pos['entry']:.2f}")
+        out.append(f"   Stop Loss: ${pos['stop_loss']:.2f}")
+        out.append(f"   Take Profit: ${pos['take_profit']:.2f}")
         current_price = latest['close']
         if pos['direction'] == 'LONG':
             unrealized = (current_price - pos['entry']) * pos.get('size', 1)
         else:
             unrealized = (pos['entry'] - current_price) * pos.get('size', 1)
-        print(f"   Unrealized P/L: ${unrealized:+.2f}")
+        out.append(f"   Unrealized P/L: ${unrealized:+.2f}")
     else:
-        print("   No open position")
+        out.append("   No open position")
     
     # Market status
-    print(f"\n📈 MARKET STATUS")
-    print(f"   Date:    {data.index[-1].strftime('%Y-%m-%d')}")
-    print(f"   Price:   ${latest['close']:.2f}")
-    print(f"   RSI:     {latest['rsi']:.1f}")
-    print(f"   Trend:   {'BULLISH' if latest['close'] > latest['ema_55'] else 'BEARISH'}")
+    out.append(f"\n📈 MARKET STATUS")
+    out.append(f"   Date:    {data.index[-1].strftime('%Y-%m-%d')}")
+    out.append(f"   Price:   ${latest['close']:.2f}")
+    out.append(f"   RSI:     {latest['rsi']:.1f}")
+    out.append(f"   Trend:   {'BULLISH' if latest['close'] > latest['ema_55'] else 'BEARISH'}")
     
     # Current signal
-    print(f"\n🚦 SIGNAL")
+    out.append(f"\n🚦 SIGNAL")
     if signal:
-        print(f"   ⚡ {signal['direction']} SIGNAL!")
-        print(f"   Entry:       ${signal['entry']:.2f}")
-        print(f"   Stop Loss:   ${signal['stop_loss']:.2f}")
-        print(f"   Take Profit: ${signal['take_profit']:.2f}")
-        print(f"   Risk:        ${abs(signal['entry'] - signal['stop_loss']):.2f} per unit")
+        out.append(f"   ⚡ {signal['direction']} SIGNAL!")
+        out.append(f"   Entry:       ${signal['entry']:.2f}")
+        out.append(f"   Stop Loss:   ${signal['stop_loss']:.2f}")
+        out.append(f"   Take Profit: ${signal['take_profit']:.2f}")
+        out.append(f"   Risk:        ${abs(signal['entry'] - signal['stop_loss']):.2f} per unit")
     else:
-        print("   No new signal today - HOLD/WAIT")
+        out.append("   No new signal today - HOLD/WAIT")
     
     # Recent trades
     if journal['trades']:
-        print(f"\n📜 RECENT TRADES")
+        out.append(f"\n📜 RECENT TRADES")
         for t in journal['trades'][-5:]:
-            print(f"   {t['date']}: {t['direction']} ${t['entry']:.2f} -> ${t['exit']:.2f} = ${t['pnl']:+.2f}")
+            out.append(f"   {t['date']}: {t['direction']} ${t['entry']:.2f} -> ${t['exit']:.2f} = ${t['pnl']:+.2f}")
+    
+    # One write for the whole dashboard instead of a flush per line
+    sys.stdout.write("\n".join(out) + "\n")
 
 
 def interactive_mode(journal, data, signal):
@@ -185,7 +252,7 @@ def interactive_mode(journal, data, signal):
             else:
                 pnl = (pos['entry'] - exit_price) * pos.get('size', 1)
             
-            journal['trades'].append({
+            record_trade(journal, {
                 'date': datetime.now().strftime('%Y-%m-%d'),
                 'direction': pos['direction'],
                 'entry': pos['entry'],
@@ -195,6 +262,9 @@ def interactive_mode(journal, data, signal):
             })
             journal['paper_capital'] += pnl
             journal['current_position'] = None
+            # The trade is already in the log: save the state now so an
+            # interrupted session cannot reload the position as still open
+            save_trade_journal(journal)
             print(f"\n✅ Position closed at ${exit_price:.2f}")
             print(f"   P/L: ${pnl:+.2f}")
         
@@ -242,7 +312,7 @@ def interactive_mode(journal, data, signal):
             else:
                 pnl = (pos['entry'] - exit_price) * pos.get('size', 1)
             
-            journal['trades'].append({
+            record_trade(journal, {
                 'date': datetime.now().strftime('%Y-%m-%d'),
                 'direction': pos['direction'],
                 'entry': pos['entry'],
@@ -252,6 +322,7 @@ def interactive_mode(journal, data, signal):
             })
             journal['paper_capital'] += pnl
             journal['current_position'] = None
+            save_trade_journal(journal)
             print(f"\n{'🛑 STOPPED OUT' if stopped else '🎯 TAKE PROFIT HIT'}!")
             print(f"   Exit: ${exit_price:.2f}")
             print(f"   P/L: ${pnl:+.2f}")
@@ -283,7 +354,8 @@ def main():
     print("\nPractice trading without risking real money!")
     
     # Load data
-    data = pd.read_csv(Path("data") / "XAU_USD_1D_sample.csv", index_col=0, parse_dates=True)
+    # Indicators are cached next to the CSV until it changes
+    data = load_signal_indicators(Path("data") / "XAU_USD_1D_sample.csv")
     
     # Load journal
     journal = load_trade_journal()
@@ -8,21 +8,22 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-import pandas as pd
 import numpy as np
 from pathlib import Path
 from datetime import datetime, timedelta
-import ta
+
+from src.analysis.signal_indicators import load_signal_indicators
 
 
 def solution_1_paper_trading():
     """Paper trading to build skills without risking real money."""
+    out = []
     
-    print("\n" + "=" * 70)
-    print("SOLUTION 1: PAPER TRADING MODE")
-    print("=" * 70)
+    out.append("\n" + "=" * 70)
+    out.append("SOLUTION 1: PAPER TRADING MODE")
+    out.append("=" * 70)
     
-    print("""
+    out.append("""
     Paper trading lets you:
     ✅ Practice the strategy with fake money
     ✅ Build confidence and discipline
@@ -35,14 +36,17 @@ def solution_1_paper_trading():
     3. Track trades in a spreadsheet
     4. After 6 months with >55% win rate, consider real trading
     """)
+    
+    sys.stdout.write("\n".join(out) + "\n")
 
 
 def solution_2_capital_calculator():
     """Calculate how long to save for proper trading capital."""
+    out = []
     
-    print("\n" + "=" * 70)
-    print("SOLUTION 2: CAPITAL ACCUMULATION PLAN")
-    print("=" * 70)
+    out.append("\n" + "=" * 70)
+    out.append("SOLUTION 2: CAPITAL ACCUMULATION PLAN")
+    out.append("=" * 70)
     
     current_savings = 100
     target = 2000  # Minimum recommended
@@ -50,7 +54,7 @@ def solution_2_capital_calculator():
     
     months_needed = (target - current_savings) / monthly_save
     
-    print(f"""
+    out.append(f"""
     Current capital: ${current_savings}
     Target capital: ${target} (minimum for this strategy)
     
@@ -62,24 +66,27 @@ def solution_2_capital_calculator():
     for save in [50, 100, 150, 200, 300]:
         months = (target - current_savings) / save
         ready_date = datetime.now() + timedelta(days=months * 30)
-        print(f"    | ${save:<10} | {months:>16.1f} | {ready_date.strftime('%B %Y'):<8} |")
+        out.append(f"    | ${save:<10} | {months:>16.1f} | {ready_date.strftime('%B %Y'):<8} |")
     
-    print(f"""
+    out.append(f"""
     MEANWHILE:
     ✅ Paper trade to practice
     ✅ Study the market daily
     ✅ Put current $100 in high-yield savings (earn 4-5%)
     """)
+    
+    sys.stdout.write("\n".join(out) + "\n")
 
 
 def solution_3_prop_firm():
     """Use prop firm to trade with their capital."""
+    out = []
     
-    print("\n" + "=" * 70)
-    print("SOLUTION 3: PROP FIRM TRADING")
-    print("=" * 70)
+    out.append("\n" + "=" * 70)
+    out.append("SOLUTION 3: PROP FIRM TRADING")
+    out.append("=" * 70)
     
-    print("""
+    out.append("""
     Prop firms give you THEIR money to trade after passing a challenge.
     
     YOUR $100 CAN BUY:
@@ -105,48 +112,32 @@ def solution_3_prop_firm():
     
     VERDICT: Strategy needs tweaking for prop firm challenges
     """)
+    
+    sys.stdout.write("\n".join(out) + "\n")
 
 
 def solution_4_signals_only():
     """Generate signals without trading - learn the patterns."""
+    out = []
     
-    print("\n" + "=" * 70)
-    print("SOLUTION 4: SIGNAL LEARNING MODE")
-    print("=" * 70)
-    
-    data = pd.read_csv(Path("data") / "XAU_USD_1D_sample.csv", index_col=0, parse_dates=True)
+    out.append("\n" + "=" * 70)
+    out.append("SOLUTION 4: SIGNAL LEARNING MODE")
+    out.append("=" * 70)
     
-    # Calculate indicators
-    data['ema_5'] = ta.trend.ema_indicator(data['close'], window=5)
-    data['ema_21'] = ta.trend.ema_indicator(data['close'], window=21)
-    data['ema_55'] = ta.trend.ema_indicator(data['close'], window=55)
-    data['rsi'] = ta.momentum.rsi(data['close'], window=14)
-    
-    data['cross_up'] = (
-        (data['ema_5'] > data['ema_21']) & 
-        (data['ema_5'].shift(1) <= data['ema_21'].shift(1))
-    )
-    data['cross_down'] = (
-        (data['ema_5'] < data['ema_21']) &
-        (data['ema_5'].shift(1) >= data['ema_21'].shift(1))
-    )
+    # Indicators (EMAs, RSI, crossovers) are cached next to the CSV until it changes
+    data = load_signal_indicators(Path("data") / "XAU_USD_1D_sample.csv")
     
     # Get recent signals
     recent = data.tail(60)
-    signals = []
-    
-    for i in range(len(recent)):
-        row = recent.iloc[i]
-        close = row['close']
-        ema_55 = row['ema_55']
-        rsi = row['rsi']
-        
-        if row['cross_up'] and close > ema_55 and rsi < 70:
-            signals.append((recent.index[i], 'LONG', close))
-        elif row['cross_down'] and close < ema_55 and rsi > 30:
-            signals.append((recent.index[i], 'SHORT', close))
-    
-    print("""
+    long_mask = recent['cross_up'] & (recent['close'] > recent['ema_55']) & (recent['rsi'] < 70)
+    short_mask = ~long_mask & recent['cross_down'] & (recent['close'] < recent['ema_55']) & (recent['rsi'] > 30)
+    
+    # Signal rows picked by boolean masks rather than a per-row loop
+    picked = long_mask | short_mask
+    directions = np.where(long_mask[picked], 'LONG', 'SHORT')
+    signals = list(zip(recent.index[picked], directions, recent['close'][picked]))
+    
+    out.append("""
     Use signals to LEARN without trading real money.
     
     RECENT SIGNALS (last 60 days):
@@ -154,27 +145,30 @@ def solution_4_signals_only():
     
     if signals:
         for date, direction, price in signals[-5:]:
-            print(f"    {date.strftime('%Y-%m-%d')}: {direction} @ ${price:.2f}")
+            out.append(f"    {date.strftime('%Y-%m-%d')}: {direction} @ ${price:.2f}")
     else:
-        print("    No signals in recent period")
+        out.append("    No signals in recent period")
     
-    print("""
+    out.append("""
     HOW TO USE:
     1. Run this daily to see signals
     2. Write down what you WOULD do
     3. Track outcome in spreadsheet
     4. After 6 months, calculate your hypothetical returns
     """)
+    
+    sys.stdout.write("\n".join(out) + "\n")
 
 
 def solution_5_micro_account():
     """Find brokers with true micro accounts."""
+    out = []
     
-    print("\n" + "=" * 70)
-    print("SOLUTION 5: TRUE MICRO ACCOUNT BROKERS")
-    print("=" * 70)
+    out.append("\n" + "=" * 70)
+    out.append("SOLUTION 5: TRUE MICRO ACCOUNT BROKERS")
+    out.append("=" * 70)
     
-    print("""
+    out.append("""
     Some brokers offer NANO lots (0.001 lot = 0.1 oz of gold)
     This makes $100 more viable:
     
@@ -201,12 +195,16 @@ def solution_5_micro_account():
     
     RECOMMENDATION: Use demo until $500+ saved
     """)
+    
+    sys.stdout.write("\n".join(out) + "\n")
 
 
 def main():
-    print("=" * 70)
-    print("5 PRACTICAL SOLUTIONS FOR $100 CAPITAL")
-    print("=" * 70)
+    out = []
+    out.append("=" * 70)
+    out.append("5 PRACTICAL SOLUTIONS FOR $100 CAPITAL")
+    out.append("=" * 70)
+    sys.stdout.write("\n".join(out) + "\n")
     
     solution_1_paper_trading()
     solution_2_capital_calculator()
@@ -215,11 +213,12 @@ def main():
     solution_5_micro_account()
     
     # Final recommendation
-    print("\n" + "=" * 70)
-    print("RECOMMENDED ACTION PLAN")
-    print("=" * 70)
+    out = []
+    out.append("\n" + "=" * 70)
+    out.append("RECOMMENDED ACTION PLAN")
+    out.append("=" * 70)
     
-    print("""
+    out.append("""
     IMMEDIATE (This Week):
     1. ✅ Set up paper trading spreadsheet
     2. ✅ Run signals daily: python scripts/practical_solutions.py
@@ -241,10 +240,11 @@ def main():
     → Better than losing $3-10 trading
     """)
     
-    print("\n" + "=" * 70)
-    print("NEXT STEP: Run paper trading mode")
-    print("Command: python scripts/paper_trade.py")
-    print("=" * 70)
+    out.append("\n" + "=" * 70)
+    out.append("NEXT STEP: Run paper trading mode")
+    out.append("Command: python scripts/paper_trade.py")
+    out.append("=" * 70)
+    sys.stdout.write("\n".join(out) + "\n")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,173 @@
+"""
+Array kernels for the indicators used in backtest hot paths.
+
+Each function takes float64 NumPy arrays and reproduces the output of the
+matching ``ta`` indicator, without building pandas objects on every call.
+They are compiled with Numba when it is installed (see ``src.utils.jit``).
+"""
+
+import math
+
+import numpy as np
+
+from ..utils.jit import njit
+
+
+@njit(cache=True)
+def ema(values, window):
+    """
+    Exponential moving average, as ``ta.trend.ema_indicator``.
+
+    Equivalent to ``ewm(span=window, adjust=False, min_periods=window)``.
+    Leading NaNs are skipped, so this can be applied to a series that
+    has its own warm-up (e.g. the MACD line).
+    """
+    n = len(values)
+    out = np.full(n, np.nan)
+    alpha = 2.0 / (window + 1.0)
+    count = 0
+    prev = 0.0
+
+    for i in range(n):
+        x = values[i]
+        if math.isnan(x):
+            if count >= window:
+                out[i] = prev
+            continue
+
+        if count == 0:
+            prev = x
+        else:
+            prev = alpha * x + (1.0 - alpha) * prev
+        count += 1
+
+        if count >= window:
+            out[i] = prev
+
+    return out
+
+
+@njit(cache=True)
+def atr(high, low, close, window):
+    """
+    Average True Range with Wilder smoothing, as ``ta.volatility.average_true_range``.
+
+    The first value is the mean true range of the first ``window`` bars;
+    bars before it are 0, matching ``ta``.
+    """
+    n = len(close)
+    out = np.zeros(n)
+    if n < window:
+        return out
+
+    tr = np.empty(n)
+    tr[0] = high[0] - low[0]
+    for i in range(1, n):
+        tr[i] = max(high[i] - low[i],
+                    abs(high[i] - close[i - 1]),
+                    abs(low[i] - close[i - 1]))
+
+    out[window - 1] = tr[:window].mean()
+    for i in range(window, n):
+        out[i] = (out[i - 1] * (window - 1) + tr[i]) / window
+
+    return out
+
+
+@njit(cache=True)
+def rsi(close, window):
+    """
+    Relative Strength Index with Wilder smoothing, as ``ta.momentum.rsi``.
+    """
+    n = len(close)
+    out = np.full(n, np.nan)
+    if n == 0:
+        return out
+
+    alpha = 1.0 / window
+    avg_up = 0.0
+    avg_down = 0.0
+
+    for i in range(n):
+        change = close[i] - close[i - 1] if i > 0 else 0.0
+        up = change if change > 0 else 0.0
+        down = -change if change < 0 else 0.0
+
+        if i == 0:
+            avg_up = up
+            avg_down = down
+        else:
+            avg_up = alpha * up + (1.0 - alpha) * avg_up
+            avg_down = alpha * down + (1.0 - alpha) * avg_down
+
+        if i >= window - 1:
+            if avg_down == 0:
+                out[i] = 100.0
+            else:
+                out[i] = 100.0 - 100.0 / (1.0 + avg_up / avg_down)
+
+    return out
+
+
+@njit(cache=True)
+def macd(close, fast=12, slow=26, signal=9):
+    """
+    MACD line and signal line, as ``ta.trend.MACD``.
+
+    The fast, slow and signal EMAs are advanced together in one pass over
+    ``close`` instead of three separate ``ema`` calls. Returns
+    ``(macd_line, signal_line)``; the line is NaN before bar ``slow - 1``
+    and the signal a further ``signal - 1`` bars. Assumes ``fast < slow``
+    and no NaNs in ``close``.
+    """
+    n = len(close)
+    out_macd = np.full(n, np.nan)
+    out_signal = np.full(n, np.nan)
+    if n == 0:
+        return out_macd, out_signal
+
+    a_fast = 2.0 / (fast + 1.0)
+    a_slow = 2.0 / (slow + 1.0)
+    a_signal = 2.0 / (signal + 1.0)
+    ema_fast = close[0]
+    ema_slow = close[0]
+    ema_signal = 0.0
+
+    for i in range(1, n):
+        x = close[i]
+        ema_fast = a_fast * x + (1.0 - a_fast) * ema_fast
+        ema_slow = a_slow * x + (1.0 - a_slow) * ema_slow
+        if i < slow - 1:
+            continue
+
+        m = ema_fast - ema_slow
+        out_macd[i] = m
+        if i == slow - 1:
+            ema_signal = m
+        else:
+            ema_signal = a_signal * m + (1.0 - a_signal) * ema_signal
+        if i >= slow + signal - 2:
+            out_signal[i] = ema_signal
+
+    return out_macd, out_signal
+
+
+@njit(cache=True)
+def crossovers(fast, slow):
+    """
+    Bars where ``fast`` crosses above / below ``slow``.
+
+    Returns ``(cross_up, cross_down)`` boolean arrays: bar ``i`` is a cross
+    up when ``fast > slow`` there and ``fast <= slow`` on bar ``i - 1``
+    (and the mirror for a cross down). The first bar and any comparison
+    involving a NaN are never crosses, matching the ``shift(1)`` form.
+    """
+    n = len(fast)
+    cross_up = np.zeros(n, dtype=np.bool_)
+    cross_down = np.zeros(n, dtype=np.bool_)
+
+    for i in range(1, n):
+        cross_up[i] = fast[i] > slow[i] and fast[i - 1] <= slow[i - 1]
+        cross_down[i] = fast[i] < slow[i] and fast[i - 1] >= slow[i - 1]
+
+    return cross_up, cross_down
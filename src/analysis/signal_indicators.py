@@ -0,0 +1,46 @@
+"""
+EMA 5/21 crossover indicators used by the paper-trading and signal
+learning scripts, with an on-disk cache of the enriched price history.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from . import kernels
+from ..data.loader import cached_parquet, read_ohlcv_csv
+
+# Columns added by add_signal_indicators()
+INDICATOR_COLUMNS = ('ema_5', 'ema_21', 'ema_55', 'atr', 'rsi', 'cross_up', 'cross_down')
+
+
+def add_signal_indicators(data: pd.DataFrame) -> pd.DataFrame:
+    """Return a copy of ``data`` with the ``INDICATOR_COLUMNS``."""
+    df = data.copy()
+    close = df['close'].to_numpy(dtype=np.float64)
+    high = df['high'].to_numpy(dtype=np.float64)
+    low = df['low'].to_numpy(dtype=np.float64)
+
+    # Array kernels: the same values as the ta indicators
+    ema_5 = kernels.ema(close, 5)
+    ema_21 = kernels.ema(close, 21)
+    df['ema_5'] = ema_5
+    df['ema_21'] = ema_21
+    df['ema_55'] = kernels.ema(close, 55)
+    df['atr'] = kernels.atr(high, low, close, 14)
+    df['rsi'] = kernels.rsi(close, 14)
+    df['cross_up'], df['cross_down'] = kernels.crossovers(ema_5, ema_21)
+    return df
+
+
+def load_signal_indicators(csv_path) -> pd.DataFrame:
+    """
+    Price history of an OHLCV CSV with the ``INDICATOR_COLUMNS``.
+
+    The result is cached as ``<name>.indicators.parquet`` next to the CSV
+    and reused until the CSV changes (see ``cached_parquet``).
+    """
+    csv_path = Path(csv_path)
+    return cached_parquet(csv_path, csv_path.with_suffix('.indicators.parquet'),
+                          lambda path: add_signal_indicators(read_ohlcv_csv(path)))
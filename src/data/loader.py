@@ -0,0 +1,72 @@
+"""
+Fast loading of the OHLCV CSV files under data/.
+"""
+
+from pathlib import Path
+
+import pandas as pd
+
+PRICE_DTYPES = {
+    'open': 'float64',
+    'high': 'float64',
+    'low': 'float64',
+    'close': 'float64',
+}
+
+
+def read_ohlcv_csv(path) -> pd.DataFrame:
+    """
+    Read an OHLCV CSV with a datetime first column as the index.
+
+    Uses pandas' pyarrow engine (multi-threaded C parser) when pyarrow is
+    installed and falls back to the default engine otherwise. Price
+    columns are declared float64 up front instead of being inferred.
+    """
+    try:
+        df = pd.read_csv(path, index_col=0, parse_dates=True,
+                         engine='pyarrow', dtype=PRICE_DTYPES)
+    except ImportError:
+        return pd.read_csv(path, index_col=0, parse_dates=True, dtype=PRICE_DTYPES)
+
+    # pyarrow yields date32 (date-only files) or second-resolution
+    # timestamps; normalise to the default engine's datetime64[ns] index
+    df.index = pd.to_datetime(df.index).as_unit('ns')
+    return df
+
+
+def cached_parquet(csv_path, cache_path, build) -> pd.DataFrame:
+    """
+    Frame derived from ``csv_path``, cached as parquet at ``cache_path``.
+
+    ``build(csv_path)`` is only called when there is no cache, or when the
+    cache was written for a different modification time of the CSV (kept
+    in the frame's ``attrs``). The CSV stays the source of truth. Without
+    a parquet engine, or if the cache cannot be written, every call builds
+    the frame.
+    """
+    csv_path = Path(csv_path)
+    mtime = csv_path.stat().st_mtime
+
+    try:
+        cached = pd.read_parquet(cache_path)
+        if cached.attrs.get('source_mtime') == mtime:
+            return cached
+    except Exception:  # No cache yet, no parquet engine, or an unreadable file
+        pass
+
+    data = build(csv_path)
+    data.attrs['source_mtime'] = mtime
+    try:
+        data.to_parquet(cache_path)
+    except Exception:  # The cache is optional: no parquet engine, a read-only or full disk
+        pass
+    return data
+
+
+def load_ohlcv(csv_path) -> pd.DataFrame:
+    """
+    ``read_ohlcv_csv`` with a parquet copy of the file cached next to it
+    as ``<name>.parquet`` (see ``cached_parquet``).
+    """
+    csv_path = Path(csv_path)
+    return cached_parquet(csv_path, csv_path.with_suffix('.parquet'), read_ohlcv_csv)
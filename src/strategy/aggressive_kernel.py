@@ -0,0 +1,207 @@
+"""
+Compiled bar loop of the aggressive prop-firm strategy.
+
+Kept in its own module, imported at the top of the grid-search script, so
+Numba's on-disk cache (``cache=True``) is keyed to one stable file and is
+populated once rather than by every worker process.
+"""
+
+import math
+
+import numpy as np
+
+from ..utils.jit import njit, prange
+
+# Storage type of the arrays fed to the loop. Prices and indicators need
+# far fewer than float32's ~7 significant digits, and half-width arrays
+# halve the memory traffic of every window.
+LOOP_DTYPE = np.float32
+
+
+@njit(cache=True)
+def aggressive_loop(closes, highs, lows, ema3_arr, ema8_arr, rsi_arr,
+                    macd_arr, macd_sig_arr, atr_arr,
+                    risk_pct, atr_sl, atr_tp, capital0,
+                    use_ema, use_macd, use_rsi):
+    """
+    Bar loop of the aggressive strategy over plain float arrays.
+    
+    The arrays may be float32 (see ``LOOP_DTYPE``): values are widened to
+    float64 as they are loaded, so prices, stops and capital are always
+    computed in double precision.
+    
+    Arrays for a disabled signal (use_* False) are never read and may be
+    empty.
+    
+    Returns (capital, status, n_trades, n_wins, days) where status is
+    0 = ran to the end of the window, 1 = hit the drawdown limit,
+    2 = hit the profit target.
+    """
+    n = len(closes)
+    capital = capital0
+    start = capital0
+    highest = capital0
+    dd_limit = start * 0.10
+    target = start * 1.10
+    position = 0.0
+    entry = 0.0
+    sl = 0.0
+    tp = 0.0
+    trail = 0.0
+    
+    n_trades = 0
+    n_wins = 0
+    
+    for i in range(25, min(55, n)):  # 30 day window
+        close = float(closes[i])
+        high = float(highs[i])
+        low = float(lows[i])
+        # Bar 25 is past the 10-bar ATR warm-up, so no NaN/zero guard needed
+        atr = float(atr_arr[i])
+        
+        # Manage position. Long and short share one code path: with
+        # d = +1/-1, "favourable" is the high for a long and the low for
+        # a short, and every comparison is made on d * price.
+        if position != 0:
+            d = 1.0 if position > 0 else -1.0
+            favourable = high if d > 0 else low
+            adverse = low if d > 0 else high
+            
+            # Trailing stop, once price has moved one ATR our way
+            if d * (favourable - entry) > atr:
+                candidate = favourable - d * atr * 0.5
+                if d * candidate > d * trail:
+                    trail = candidate
+            eff_sl = trail if d * trail > d * sl else sl
+            
+            exit_price = math.nan
+            if d * (adverse - eff_sl) <= 0:
+                exit_price = eff_sl
+            elif d * (favourable - tp) >= 0:
+                exit_price = tp
+            
+            if not math.isnan(exit_price):
+                pnl = (exit_price - entry) * position
+                capital += pnl
+                n_trades += 1
+                n_wins += pnl > 0
+                position = 0.0
+        
+        # New entry - multiple signal types
+        if position == 0:
+            long = False
+            short = False
+            
+            # Signal 1: EMA crossover
+            if use_ema:
+                ema3 = ema3_arr[i]
+                ema8 = ema8_arr[i]
+                prev_ema3 = ema3_arr[i-1]
+                prev_ema8 = ema8_arr[i-1]
+                
+                if ema3 > ema8 and prev_ema3 <= prev_ema8:
+                    long = True
+                elif ema3 < ema8 and prev_ema3 >= prev_ema8:
+                    short = True
+            
+            # Signal 2: MACD crossover
+            if use_macd:
+                macd_val = macd_arr[i]
+                macd_sig_val = macd_sig_arr[i]
+                prev_macd = macd_arr[i-1]
+                prev_macd_sig = macd_sig_arr[i-1]
+                
+                if macd_val > macd_sig_val and prev_macd <= prev_macd_sig:
+                    long = True
+                elif macd_val < macd_sig_val and prev_macd >= prev_macd_sig:
+                    short = True
+            
+            # Signal 3: RSI extremes with reversal
+            if use_rsi:
+                rsi = rsi_arr[i]
+                
+                if rsi < 20 and close > closes[i-1]:
+                    long = True
+                elif rsi > 80 and close < closes[i-1]:
+                    short = True
+            
+            d = 1.0 if long else -1.0 if short else 0.0
+            if d != 0:
+                sl = close - d * atr * atr_sl
+                tp = close + d * atr * atr_tp
+                risk = d * (close - sl)
+                size = (capital * risk_pct) / risk
+                position = d * size
+                entry = close
+                trail = -d * math.inf  # no trail until price moves our way
+        
+        highest = highest if highest > capital else capital
+        
+        # Check drawdown limit
+        if highest - capital > dd_limit:
+            return capital, 1, n_trades, n_wins, i - 25 + 1
+        
+        # Check if passed
+        if capital >= target:
+            return capital, 2, n_trades, n_wins, i - 25 + 1
+    
+    # Close position at end
+    if position != 0:
+        close = float(closes[min(54, n-1)])
+        pnl = (close - entry) * position
+        capital += pnl
+        n_trades += 1
+        n_wins += pnl > 0
+    
+    return capital, 0, n_trades, n_wins, min(55, n) - 25
+
+
+def warm_up():
+    """
+    Compile ``aggressive_loop`` (or load it from the cache) on a tiny input.
+
+    Call this in the parent before starting a process pool so workers
+    never trigger compilation themselves.
+    """
+    bars = np.ones(60, dtype=LOOP_DTYPE)
+    aggressive_loop(bars, bars, bars, bars, bars, bars, bars, bars, bars,
+                    0.05, 1.0, 2.0, 10000.0, True, True, True)
+
+
+@njit(cache=True, parallel=True)
+def grid_search(closes, highs, lows, ema3_arr, ema8_arr, rsi_arr,
+                macd_arr, macd_sig_arr, atr_arr,
+                risks, atr_sls, atr_tps, starts, window, capital0):
+    """
+    Run the challenge (all signals on) for every (risk, SL, TP) combination
+    on every window ``[start, start + window)`` of full-series arrays.
+    
+    Combinations are spread over threads with ``prange``; every thread
+    reads the same indicator arrays. Returns an array of shape
+    ``(len(risks), len(atr_sls), len(atr_tps), len(starts), 3)`` holding
+    (profit %, passed, trades) per window.
+    """
+    n_sl = len(atr_sls)
+    n_tp = len(atr_tps)
+    n_win = len(starts)
+    n = len(closes)
+    out = np.empty((len(risks), n_sl, n_tp, n_win, 3))
+    target = capital0 * 1.10
+    
+    for k in prange(len(risks) * n_sl * n_tp):
+        r = k // (n_sl * n_tp)
+        s = (k // n_tp) % n_sl
+        t = k % n_tp
+        for w in range(n_win):
+            a = starts[w]
+            b = min(a + window, n)
+            capital, status, n_trades, n_wins, days = aggressive_loop(
+                closes[a:b], highs[a:b], lows[a:b], ema3_arr[a:b], ema8_arr[a:b],
+                rsi_arr[a:b], macd_arr[a:b], macd_sig_arr[a:b], atr_arr[a:b],
+                risks[r], atr_sls[s], atr_tps[t], capital0, True, True, True
+            )
+            out[r, s, t, w, 0] = (capital - capital0) / capital0 * 100
+            out[r, s, t, w, 1] = status == 2 or (status == 0 and capital >= target)
+            out[r, s, t, w, 2] = n_trades
+    
+    return out
@@ -0,0 +1,253 @@
+"""
+Compiled bar loop of ``FinalStrategy`` (scripts/final_optimization.py),
+``OptimizedEMAStrategy`` (scripts/optimize_ema.py) and ``WorkingStrategy``
+(``src.strategy.working_strategy``).
+
+The loop only does scalar arithmetic on price and indicator arrays, so it
+runs under Numba when available; dates and exit-reason names are attached
+afterwards by the caller from the returned trade records.
+"""
+
+import math
+
+import numpy as np
+
+from ..utils.jit import njit, prange
+
+# Exit reasons, stored as integer codes in the trade records
+EXIT_REASONS = ('stop', 'take_profit', 'signal', 'end')
+STOP, TAKE_PROFIT, SIGNAL, END = range(4)
+
+# Per-combination statistics returned by ``param_sweep``, in order
+SWEEP_FIELDS = ('capital', 'trades', 'wins', 'losses', 'gross_profit', 'gross_loss',
+                'max_dd', 'sharpe')
+
+# One closed trade, as returned by ``final_loop``
+TRADE_DTYPE = np.dtype([
+    ('entry_i', np.int64),
+    ('side', np.int8),
+    ('size', np.float64),
+    ('entry_price', np.float64),
+    ('exit_price', np.float64),
+    ('pnl', np.float64),
+    ('reason', np.int8),
+])
+
+
+def fill_atr(atr, close):
+    """
+    ATR ready for ``final_loop``: NaN or non-positive values (the warm-up
+    bars) are replaced by 1% of the close, in one vectorised pass.
+    """
+    return np.where(np.isnan(atr) | (atr <= 0), close * 0.01, atr)
+
+
+@njit(cache=True)
+def _record_trade(trades, k, entry_i, position, entry_price, exit_price, pnl, reason):
+    trade = trades[k]
+    trade['entry_i'] = entry_i
+    trade['side'] = 1 if position > 0 else -1
+    trade['size'] = abs(position)
+    trade['entry_price'] = entry_price
+    trade['exit_price'] = exit_price
+    trade['pnl'] = pnl
+    trade['reason'] = reason
+
+
+@njit(cache=True)
+def final_loop(closes, highs, lows, atrs, ema_trends, rsis, cross_ups, cross_downs,
+               first_bar, initial_capital, risk_per_trade, sl_mult, tp_mult, trail_mult,
+               max_position, ruin_capital, positions, equity):
+    """
+    Run the strategy from bar ``first_bar`` to the end of the arrays.
+
+    ``atrs`` must be positive with no NaNs (see ``fill_atr``). Position
+    size is capped at ``max_position`` times capital in notional.
+    Trading stops for good once the account is flat with capital below
+    ``ruin_capital``; the remaining bars keep that capital and no position.
+    The signed position and marked-to-market equity of every bar from
+    ``first_bar`` on are written into the caller's ``positions`` and
+    ``equity`` buffers. Returns ``(capital, trades)``: final capital and
+    a ``TRADE_DTYPE`` record per closed trade (side is +1/-1, reason is
+    an ``EXIT_REASONS`` index).
+    """
+    n = len(closes)
+    # At most one trade closes per bar, plus one at the end
+    trades = np.empty(n + 1, dtype=TRADE_DTYPE)
+    n_trades = 0
+
+    capital = initial_capital
+    # Position state is a direction (+1 long, -1 short, 0 flat) and a
+    # size >= 0, so long and short share one code path: every comparison
+    # is made on side * price.
+    side = 0
+    size = 0.0
+    entry_price = 0.0
+    entry_i = 0
+    stop_loss = 0.0
+    take_profit = 0.0
+    extreme = 0.0  # highest high of a long / lowest low of a short
+
+    for i in range(first_bar, n):
+        close = closes[i]
+        high = highs[i]
+        low = lows[i]
+        atr = atrs[i]
+        ema_trend = ema_trends[i]
+        rsi = rsis[i]
+
+        # Position management
+        if side != 0:
+            d = float(side)
+            favourable = high if side > 0 else low
+            adverse = low if side > 0 else high
+            against = cross_downs[i] if side > 0 else cross_ups[i]
+
+            extreme = d * max(d * extreme, d * favourable)
+            trail = extreme - d * atr * trail_mult
+            eff_stop = d * max(d * stop_loss, d * trail)
+
+            reason = -1
+            if d * adverse <= d * eff_stop:
+                exit_price = eff_stop
+                reason = STOP
+            elif d * favourable >= d * take_profit:
+                exit_price = take_profit
+                reason = TAKE_PROFIT
+            elif against:
+                exit_price = close
+                reason = SIGNAL
+
+            if reason >= 0:
+                pnl = d * (exit_price - entry_price) * size
+                capital += pnl
+                _record_trade(trades, n_trades, entry_i, d * size, entry_price, exit_price, pnl, reason)
+                n_trades += 1
+                side = 0
+                size = 0.0
+
+        # Entry
+        if side == 0:
+            signal = 0
+            if cross_ups[i] and close > ema_trend and rsi < 70:
+                signal = 1
+            elif cross_downs[i] and close < ema_trend and rsi > 30:
+                signal = -1
+
+            if signal != 0:
+                d = float(signal)
+                stop_loss = close - d * atr * sl_mult
+                take_profit = close + d * atr * tp_mult
+                risk = d * (close - stop_loss)
+
+                if risk > 0:
+                    size = (capital * risk_per_trade) / risk
+                    max_size = (capital * max_position) / close
+                    size = min(size, max_size)
+
+                    side = signal
+                    entry_price = close
+                    entry_i = i
+                    extreme = close
+
+        position = side * size
+        positions[i] = position
+        unrealized = (close - entry_price) * position if side != 0 else 0.0
+        equity[i] = capital + unrealized
+
+        if side == 0 and capital < ruin_capital:
+            # Ruined: nothing left to simulate
+            positions[i + 1:] = 0.0
+            equity[i + 1:] = capital
+            break
+
+    if side != 0:
+        close = closes[n - 1]
+        d = float(side)
+        pnl = d * (close - entry_price) * size
+        capital += pnl
+        _record_trade(trades, n_trades, entry_i, d * size, entry_price, close, pnl, END)
+        n_trades += 1
+
+    return capital, trades[:n_trades]
+
+
+@njit(cache=True)
+def _equity_stats(equity):
+    """Max drawdown (fraction of the running peak) and annualised Sharpe of daily returns."""
+    n = len(equity)
+    peak = equity[0]
+    max_dd = 0.0
+    for i in range(n):
+        if equity[i] > peak:
+            peak = equity[i]
+        dd = (peak - equity[i]) / peak
+        if dd > max_dd:
+            max_dd = dd
+
+    sharpe = 0.0
+    if n > 2:
+        returns = equity[1:] / equity[:-1] - 1.0
+        std = returns.std() * math.sqrt((n - 1) / (n - 2))  # Sample std (ddof=1)
+        if std > 0:
+            sharpe = (returns.mean() * 252) / (std * math.sqrt(252))
+    return max_dd, sharpe
+
+
+@njit(cache=True, parallel=True)
+def param_sweep(closes, highs, lows, atrs, ema_trends, rsis, cross_ups, cross_downs,
+                first_bar, initial_capital, risks, sl_mults, tp_mults, trail_mults,
+                max_position, ruin_capital, min_trades=0):
+    """
+    Run ``final_loop`` for every (risk, SL, TP, trail) combination.
+
+    The (risk, TP, trail) groups are spread over threads with ``prange``
+    and each walks ``sl_mults`` in order; every thread reads the same price
+    and indicator arrays and has its own position and equity buffers (flat
+    at ``initial_capital`` before ``first_bar``). Returns an array of shape
+    ``(len(risks), len(sl_mults), len(tp_mults), len(trail_mults),
+    len(SWEEP_FIELDS))``. Cells with ``tp <= sl`` are not run and hold NaN.
+
+    With ``min_trades > 0`` a group stops at the first SL that closes fewer
+    than ``min_trades`` trades: a wider stop with the same target is taken
+    to trade no more often, so the later (larger, if ``sl_mults`` is sorted)
+    SL cells are pruned and also hold NaN.
+    """
+    n = len(closes)
+    n_sl = len(sl_mults)
+    n_tp = len(tp_mults)
+    n_trail = len(trail_mults)
+    out = np.full((len(risks), n_sl, n_tp, n_trail, len(SWEEP_FIELDS)), np.nan)
+
+    for k in prange(len(risks) * n_tp * n_trail):
+        r = k // (n_tp * n_trail)
+        t = (k // n_trail) % n_tp
+        u = k % n_trail
+        positions = np.zeros(n)
+        equity = np.zeros(n)
+        equity[:first_bar] = initial_capital
+
+        for s in range(n_sl):
+            if tp_mults[t] <= sl_mults[s]:
+                continue
+
+            capital, trades = final_loop(
+                closes, highs, lows, atrs, ema_trends, rsis, cross_ups, cross_downs,
+                first_bar, initial_capital, risks[r], sl_mults[s], tp_mults[t], trail_mults[u],
+                max_position, ruin_capital, positions, equity
+            )
+
+            pnl = trades['pnl']
+            cell = out[r, s, t, u]
+            cell[0] = capital
+            cell[1] = len(pnl)
+            cell[2] = (pnl > 0).sum()
+            cell[3] = (pnl < 0).sum()
+            cell[4] = pnl[pnl > 0].sum()
+            cell[5] = -pnl[pnl < 0].sum()
+            cell[6], cell[7] = _equity_stats(equity)
+
+            if len(pnl) < min_trades:
+                break
+
+    return out
@@ -0,0 +1,118 @@
+"""
+Retail-account backtest engine behind the "hard truth" reports.
+
+Runs the long-only EMA-crossover strategy through ``real_trading_kernel``
+with a broker's minimum lot, spread, commission and leverage applied, so
+small accounts see the costs and margin limits they would really face.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from ..analysis import kernels
+from .real_trading_kernel import EXIT_REASONS, capital_sweep, long_signals, real_trading_loop
+
+# First bar traded, once the 55 EMA has enough history
+FIRST_BAR = 66
+
+
+@dataclass(frozen=True)
+class BrokerParams:
+    spread_cost: float = 0.30  # $ spread per trade
+    commission: float = 0.07   # $ commission per micro lot
+    min_lot: float = 0.01      # Minimum 0.01 lot (1 oz)
+    leverage: float = 100      # 100:1 leverage
+
+
+def precompute_features(data: pd.DataFrame) -> dict:
+    """
+    Price, ATR and entry-signal arrays used by ``simulate_real_trading``.
+
+    They depend only on the price data, not on the account, so a sweep
+    over capital levels computes them once and passes them to every run.
+    """
+    close = data['close'].to_numpy(dtype=np.float64)
+    high = data['high'].to_numpy(dtype=np.float64)
+    low = data['low'].to_numpy(dtype=np.float64)
+
+    # Array kernels reproduce the ta indicators (warm-up NaNs included)
+    cross_up, _ = kernels.crossovers(kernels.ema(close, 5), kernels.ema(close, 21))
+    atr = kernels.atr(high, low, close, 14)
+
+    features = {
+        'close': close,
+        'high': high,
+        'low': low,
+        # ATR is undefined during its warm-up; fall back to 1% of price
+        'atr': np.where(np.isnan(atr), close * 0.01, atr),
+        'long_sig': long_signals(cross_up, close, kernels.ema(close, 55), kernels.rsi(close, 14)),
+    }
+    return features
+
+
+def simulate_real_trading(data: pd.DataFrame, initial_capital: float,
+                          broker: BrokerParams = BrokerParams(),
+                          features: dict = None) -> dict:
+    """
+    Simulate REAL trading with:
+    - Minimum position sizes
+    - Actual transaction costs
+    - Margin requirements
+    - Realistic execution
+
+    Pass ``features`` from ``precompute_features(data)`` to reuse the
+    indicators across several runs on the same data.
+    """
+    if features is None:
+        features = precompute_features(data)
+
+    capital, skipped_signals, margin_rejections, trade_arrays = real_trading_loop(
+        features['close'], features['high'], features['low'], features['atr'], features['long_sig'],
+        FIRST_BAR, float(initial_capital),
+        broker.spread_cost, broker.commission, broker.min_lot, broker.leverage
+    )
+
+    # Closed trades stay column-oriented: one array per field
+    entries, exits, sizes, gross_pnls, costs, net_pnls, reasons = trade_arrays
+    trades = pd.DataFrame({
+        'side': 'long',
+        'entry': entries,
+        'exit': exits,
+        'size_oz': sizes,
+        'gross_pnl': gross_pnls,
+        'costs': costs,
+        'net_pnl': net_pnls,
+        'reason': np.array(EXIT_REASONS)[reasons],
+    })
+
+    return {
+        'initial': initial_capital,
+        'final': capital,
+        'net_pnl': capital - initial_capital,
+        'return_pct': ((capital - initial_capital) / initial_capital) * 100,
+        'trades': trades,
+        'skipped': skipped_signals,
+        'margin_rejected': margin_rejections
+    }
+
+
+def simulate_capital_sweep(data: pd.DataFrame, capitals,
+                           broker: BrokerParams = BrokerParams(),
+                           features: dict = None) -> np.ndarray:
+    """
+    ``simulate_real_trading`` for several starting capitals in one call.
+
+    Runs are spread over threads by the kernel. Returns an array with one
+    row of (final capital, trades, skipped signals, margin rejections) per
+    capital.
+    """
+    if features is None:
+        features = precompute_features(data)
+
+    return capital_sweep(
+        features['close'], features['high'], features['low'], features['atr'], features['long_sig'],
+        FIRST_BAR, np.asarray(capitals, dtype=np.float64),
+        broker.spread_cost, broker.commission, broker.min_lot, broker.leverage
+    )
@@ -0,0 +1,189 @@
+"""
+Compiled bar loop of ``simulate_real_trading`` (``src.strategy.real_trading``).
+
+Simulates a small retail account trading the EMA-crossover strategy long
+only, with a minimum lot size, spread and commission on every fill and a
+margin check before each entry.
+"""
+
+import math
+
+import numpy as np
+
+from ..utils.jit import njit, prange
+
+# Exit reasons, stored as integer codes in the trade arrays
+EXIT_REASONS = ('stop', 'take_profit', 'end')
+STOP, TAKE_PROFIT, END = range(3)
+
+
+def long_signals(cross_up, close, ema_55, rsi):
+    """
+    Entry signal of every bar: a fast/slow EMA cross up while price is
+    above the 55 EMA and RSI is below 70.
+    """
+    return cross_up & (close > ema_55) & (rsi < 70)
+
+
+@njit(cache=True)
+def real_trading_loop(close_a, high_a, low_a, atr_a, long_sig_a,
+                      first_bar, initial_capital, spread_cost, commission, min_lot, leverage):
+    """
+    Run the account from bar ``first_bar`` to the end of the arrays.
+
+    ``atr_a`` must have no NaNs and ``long_sig_a`` marks the bars with an
+    entry signal (see ``long_signals``). Returns ``(capital, skipped_signals,
+    margin_rejections, trades)`` where ``trades`` is a tuple of parallel
+    arrays ``(entry, exit, size_oz, gross_pnl, costs, net_pnl, reason)``,
+    one element per closed trade, with reason an ``EXIT_REASONS`` index.
+    """
+    n = len(close_a)
+    # At most one trade closes per bar, plus one at the end
+    entries = np.empty(n + 1)
+    exits = np.empty(n + 1)
+    sizes = np.empty(n + 1)
+    gross_pnls = np.empty(n + 1)
+    costs = np.empty(n + 1)
+    net_pnls = np.empty(n + 1)
+    reasons = np.empty(n + 1, dtype=np.int8)
+    n_trades = 0
+
+    capital = initial_capital
+    position = 0.0  # In ounces of gold
+    entry_price = 0.0
+    stop_loss = 0.0
+    take_profit = 0.0
+    highest = 0.0
+
+    skipped_signals = 0
+    margin_rejections = 0
+
+    # Spread plus commission, paid on every entry and every exit
+    fill_cost = spread_cost + commission
+
+    for i in range(first_bar, n):
+        close = close_a[i]
+        high = high_a[i]
+        low = low_a[i]
+        atr = atr_a[i]
+
+        # Manage existing long position (shorts are never opened)
+        if position > 0:
+            # Compare-and-assign rather than max(): same result, and much
+            # cheaper per bar when the loop runs as plain Python
+            if high > highest:
+                highest = high
+            trail = highest - atr * 1.5
+            eff_stop = trail if trail > stop_loss else stop_loss
+
+            reason = -1
+            if low <= eff_stop:
+                exit_price = eff_stop
+                reason = STOP
+            elif high >= take_profit:
+                exit_price = take_profit
+                reason = TAKE_PROFIT
+
+            if reason >= 0:
+                gross_pnl = (exit_price - entry_price) * position
+                exit_cost = fill_cost
+                net_pnl = gross_pnl - exit_cost
+                capital += net_pnl
+
+                entries[n_trades] = entry_price
+                exits[n_trades] = exit_price
+                sizes[n_trades] = position
+                gross_pnls[n_trades] = gross_pnl
+                costs[n_trades] = exit_cost
+                net_pnls[n_trades] = net_pnl
+                reasons[n_trades] = reason
+                n_trades += 1
+                position = 0.0
+
+        # New entry (long signals only)
+        if position == 0 and long_sig_a[i]:
+            # Calculate position size
+            stop_loss = close - atr * 1.5
+            take_profit = close + atr * 3.0
+            risk_per_unit = close - stop_loss
+
+            # Risk 2% of capital
+            risk_amount = capital * 0.02
+            ideal_size_oz = risk_amount / risk_per_unit
+
+            # 0.01 lot = minimum tradeable (1 micro lot = 1 oz)
+            min_size_oz = min_lot
+
+            # Check if we can afford minimum position
+            margin_required = (min_size_oz * close) / leverage
+            entry_cost = fill_cost
+
+            if margin_required + entry_cost > capital * 0.9:
+                margin_rejections += 1
+                continue
+
+            if ideal_size_oz < min_size_oz:
+                # Position too small - can we even trade minimum?
+                if margin_required < capital * 0.5:
+                    position = min_size_oz
+                else:
+                    skipped_signals += 1
+                    continue
+            else:
+                # Round to valid lot size (half up; floor is one instruction
+                # under Numba, unlike round()'s half-to-even)
+                lots = math.floor(ideal_size_oz / min_size_oz + 0.5)
+                position = max(min_size_oz, lots * min_size_oz)
+
+            entry_price = close
+            highest = close
+
+            # Deduct entry costs immediately
+            capital -= entry_cost
+
+    # Close remaining position
+    if position != 0:
+        close = close_a[n - 1]
+        gross_pnl = (close - entry_price) * position
+        exit_cost = fill_cost
+        net_pnl = gross_pnl - exit_cost
+        capital += net_pnl
+
+        entries[n_trades] = entry_price
+        exits[n_trades] = close
+        sizes[n_trades] = position
+        gross_pnls[n_trades] = gross_pnl
+        costs[n_trades] = exit_cost
+        net_pnls[n_trades] = net_pnl
+        reasons[n_trades] = END
+        n_trades += 1
+
+    trades = (entries[:n_trades], exits[:n_trades], sizes[:n_trades], gross_pnls[:n_trades],
+              costs[:n_trades], net_pnls[:n_trades], reasons[:n_trades])
+    return capital, skipped_signals, margin_rejections, trades
+
+
+@njit(cache=True, parallel=True)
+def capital_sweep(close_a, high_a, low_a, atr_a, long_sig_a, first_bar, capitals,
+                  spread_cost, commission, min_lot, leverage):
+    """
+    Run ``real_trading_loop`` once per starting capital in ``capitals``.
+
+    Only sizing, costs and margin depend on the capital, so every run reads
+    the same arrays; runs are spread over threads with ``prange``. Returns
+    an array of shape ``(len(capitals), 4)`` holding (final capital,
+    trades, skipped signals, margin rejections) per capital.
+    """
+    out = np.empty((len(capitals), 4))
+
+    for k in prange(len(capitals)):
+        capital, skipped, rejected, trades = real_trading_loop(
+            close_a, high_a, low_a, atr_a, long_sig_a, first_bar, capitals[k],
+            spread_cost, commission, min_lot, leverage
+        )
+        out[k, 0] = capital
+        out[k, 1] = len(trades[0])
+        out[k, 2] = skipped
+        out[k, 3] = rejected
+
+    return out
@@ -11,9 +11,12 @@ A practical strategy that actually generates trades with:
 import pandas as pd
 import numpy as np
 from typing import Dict, Any, Optional
-import ta
 import logging
 
+from ..analysis import kernels
+from ..utils.soa import to_soa
+from .final_kernel import fill_atr, final_loop, param_sweep
+
 logger = logging.getLogger(__name__)
 
 
@@ -25,15 +28,25 @@ class WorkingStrategy:
     Exit: ATR-based stop loss and take profit with trailing stop
     """
     
+    FIRST_BAR = 60  # Bars of indicator warm-up before trading
+    # Trade-list names of final_kernel's EXIT_REASONS, in code order
+    EXIT_REASONS = ('stop_loss', 'take_profit', 'signal_reversal', 'end_of_data')
+    
     def __init__(self,
                  data: pd.DataFrame,
                  initial_capital: float = 10000,
                  risk_per_trade: float = 0.02,
                  sl_atr_mult: float = 2.0,
                  tp_atr_mult: float = 4.0,
-                 trail_atr_mult: float = 1.5):
-        
-        self.data = data.copy()
+                 trail_atr_mult: float = 1.5,
+                 indicators: Optional[Dict[str, np.ndarray]] = None):
+        """
+        ``indicators`` may be the dict returned by ``precompute_indicators``
+        for the same ``data``; it is used instead of recomputing them.
+        ``data`` is only read, never copied or modified, so it can be
+        shared by every strategy in a parameter sweep.
+        """
+        self.data = data
         self.initial_capital = initial_capital
         self.risk_per_trade = risk_per_trade
         self.sl_atr_mult = sl_atr_mult
@@ -44,237 +57,131 @@ class WorkingStrategy:
         self.capital = pd.Series(index=data.index, data=0.0)
         self.trades = []
         
-        self._calculate_indicators()
+        self._calculate_indicators(indicators)
     
-    def _calculate_indicators(self):
-        """Calculate indicators."""
-        self.data['ema_8'] = ta.trend.ema_indicator(self.data['close'], window=8)
-        self.data['ema_21'] = ta.trend.ema_indicator(self.data['close'], window=21)
-        self.data['ema_55'] = ta.trend.ema_indicator(self.data['close'], window=55)
-        self.data['atr'] = ta.volatility.average_true_range(
-            self.data['high'], self.data['low'], self.data['close'], window=14
-        )
-        self.data['rsi'] = ta.momentum.rsi(self.data['close'], window=14)
-        
-        # EMA crossovers
-        self.data['ema_cross_up'] = (
-            (self.data['ema_8'] > self.data['ema_21']) & 
-            (self.data['ema_8'].shift(1) <= self.data['ema_21'].shift(1))
-        )
-        self.data['ema_cross_down'] = (
-            (self.data['ema_8'] < self.data['ema_21']) &
-            (self.data['ema_8'].shift(1) >= self.data['ema_21'].shift(1))
-        )
+    @staticmethod
+    def precompute_indicators(data: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """
+        Indicators of ``data`` as arrays, keyed by column name.
+        
+        They depend only on prices, not on risk or stop settings, so a
+        parameter sweep computes them once and passes the dict to every
+        strategy.
+        """
+        close = data['close'].to_numpy(dtype=np.float64)
+        high = data['high'].to_numpy(dtype=np.float64)
+        low = data['low'].to_numpy(dtype=np.float64)
+        
+        # Array kernels: the same values as the ta indicators
+        ema_8 = kernels.ema(close, 8)
+        ema_21 = kernels.ema(close, 21)
+        cross_up, cross_down = kernels.crossovers(ema_8, ema_21)
+        return {
+            'ema_8': ema_8,
+            'ema_21': ema_21,
+            'ema_55': kernels.ema(close, 55),
+            'atr': kernels.atr(high, low, close, 14),
+            'rsi': kernels.rsi(close, 14),
+            'ema_cross_up': cross_up,
+            'ema_cross_down': cross_down,
+        }
+    
+    def _calculate_indicators(self, indicators: Optional[Dict[str, np.ndarray]] = None):
+        """Calculate indicators (kept as arrays in ``self.indicators``)."""
+        if indicators is None:
+            indicators = self.precompute_indicators(self.data)
+        self.indicators = indicators
     
     def generate_signals(self) -> pd.Series:
         """Generate trading signals."""
-        signals = pd.Series(index=self.data.index, data=0)
-        
-        for i in range(60, len(self.data)):
-            close = self.data['close'].iloc[i]
-            ema_55 = self.data['ema_55'].iloc[i]
-            rsi = self.data['rsi'].iloc[i]
-            
-            # Long: EMA cross up + price above EMA 55 + RSI not overbought
-            if self.data['ema_cross_up'].iloc[i]:
-                if close > ema_55 and rsi < 70:
-                    signals.iloc[i] = 1
-            
-            # Short: EMA cross down + price below EMA 55 + RSI not oversold
-            if self.data['ema_cross_down'].iloc[i]:
-                if close < ema_55 and rsi > 30:
-                    signals.iloc[i] = -1
-        
-        return signals
+        close = self.data['close'].to_numpy()
+        ema_55 = self.indicators['ema_55']
+        rsi = self.indicators['rsi']
+        
+        # Long: EMA cross up + price above EMA 55 + RSI not overbought
+        long_sig = self.indicators['ema_cross_up'] & (close > ema_55) & (rsi < 70)
+        # Short: EMA cross down + price below EMA 55 + RSI not oversold
+        short_sig = self.indicators['ema_cross_down'] & (close < ema_55) & (rsi > 30)
+        
+        signals = np.where(short_sig, -1, np.where(long_sig, 1, 0))
+        signals[:self.FIRST_BAR] = 0
+        return pd.Series(signals, index=self.data.index)
     
     def backtest(self) -> Dict[str, Any]:
         """Run backtest."""
-        signals = self.generate_signals()
-        
-        capital = self.initial_capital
-        position = 0
-        entry_price = 0
-        stop_loss = 0
-        take_profit = 0
-        highest_price = 0
-        lowest_price = float('inf')
-        
-        self.trades = []
-        current_trade = None
-        
-        for i in range(len(self.data)):
-            if i < 60:
-                self.capital.iloc[i] = capital
-                self.positions.iloc[i] = 0
-                continue
-            
-            close = self.data['close'].iloc[i]
-            high = self.data['high'].iloc[i]
-            low = self.data['low'].iloc[i]
-            atr = self.data['atr'].iloc[i]
-            signal = signals.iloc[i]
-            
-            if pd.isna(atr) or atr <= 0:
-                atr = close * 0.01
-            
-            # Manage existing position
-            if position > 0:  # Long
-                highest_price = max(highest_price, high)
-                
-                # Calculate trailing stop
-                trail_stop = highest_price - atr * self.trail_atr_mult
-                effective_stop = max(stop_loss, trail_stop)
-                
-                # Check stop
-                if low <= effective_stop:
-                    exit_price = effective_stop
-                    pnl = (exit_price - entry_price) * position
-                    capital += pnl
-                    
-                    if current_trade:
-                        current_trade['exit_price'] = exit_price
-                        current_trade['exit_reason'] = 'stop_loss'
-                        current_trade['pnl'] = pnl
-                        self.trades.append(current_trade)
-                    
-                    position = 0
-                    current_trade = None
-                
-                # Check take profit
-                elif high >= take_profit:
-                    exit_price = take_profit
-                    pnl = (exit_price - entry_price) * position
-                    capital += pnl
-                    
-                    if current_trade:
-                        current_trade['exit_price'] = exit_price
-                        current_trade['exit_reason'] = 'take_profit'
-                        current_trade['pnl'] = pnl
-                        self.trades.append(current_trade)
-                    
-                    position = 0
-                    current_trade = None
-                
-                # Check signal reversal
-                elif signal == -1:
-                    exit_price = close
-                    pnl = (exit_price - entry_price) * position
-                    capital += pnl
-                    
-                    if current_trade:
-                        current_trade['exit_price'] = exit_price
-                        current_trade['exit_reason'] = 'signal_reversal'
-                        current_trade['pnl'] = pnl
-                        self.trades.append(current_trade)
-                    
-                    position = 0
-                    current_trade = None
-            
-            elif position < 0:  # Short
-                lowest_price = min(lowest_price, low)
-                
-                # Trailing stop
-                trail_stop = lowest_price + atr * self.trail_atr_mult
-                effective_stop = min(stop_loss, trail_stop)
-                
-                # Check stop
-                if high >= effective_stop:
-                    exit_price = effective_stop
-                    pnl = (entry_price - exit_price) * abs(position)
-                    capital += pnl
-                    
-                    if current_trade:
-                        current_trade['exit_price'] = exit_price
-                        current_trade['exit_reason'] = 'stop_loss'
-                        current_trade['pnl'] = pnl
-                        self.trades.append(current_trade)
-                    
-                    position = 0
-                    current_trade = None
-                
-                # Check take profit
-                elif low <= take_profit:
-                    exit_price = take_profit
-                    pnl = (entry_price - exit_price) * abs(position)
-                    capital += pnl
-                    
-                    if current_trade:
-                        current_trade['exit_price'] = exit_price
-                        current_trade['exit_reason'] = 'take_profit'
-                        current_trade['pnl'] = pnl
-                        self.trades.append(current_trade)
-                    
-                    position = 0
-                    current_trade = None
-                
-                # Signal reversal
-                elif signal == 1:
-                    exit_price = close
-                    pnl = (entry_price - exit_price) * abs(position)
-                    capital += pnl
-                    
-                    if current_trade:
-                        current_trade['exit_price'] = exit_price
-                        current_trade['exit_reason'] = 'signal_reversal'
-                        current_trade['pnl'] = pnl
-                        self.trades.append(current_trade)
-                    
-                    position = 0
-                    current_trade = None
-            
-            # New entry
-            if position == 0 and signal != 0:
-                risk_amount = capital * self.risk_per_trade
-                
-                if signal == 1:  # Long
-                    stop_loss = close - atr * self.sl_atr_mult
-                    take_profit = close + atr * self.tp_atr_mult
-                    risk_per_unit = close - stop_loss
-                else:  # Short
-                    stop_loss = close + atr * self.sl_atr_mult
-                    take_profit = close - atr * self.tp_atr_mult
-                    risk_per_unit = stop_loss - close
-                
-                if risk_per_unit > 0:
-                    position_size = risk_amount / risk_per_unit
-                    max_size = (capital * 0.1) / close
-                    position_size = min(position_size, max_size)
-                    
-                    position = position_size if signal > 0 else -position_size
-                    entry_price = close
-                    highest_price = close
-                    lowest_price = close
-                    
-                    current_trade = {
-                        'entry_date': self.data.index[i],
-                        'entry_price': entry_price,
-                        'side': 'long' if signal > 0 else 'short',
-                        'size': abs(position),
-                        'stop_loss': stop_loss,
-                        'take_profit': take_profit
-                    }
-            
-            self.positions.iloc[i] = position
-            unrealized = (close - entry_price) * position if position != 0 else 0
-            self.capital.iloc[i] = capital + unrealized
+        signals = self.generate_signals().to_numpy()
+        
+        arrays = to_soa(self.data, ['close', 'high', 'low'], dtype=np.float64)
+        close = arrays['close']
+        atr = fill_atr(self.indicators['atr'], close)
+        
+        # The compiled loop is FinalStrategy's; it is fed the filtered
+        # signals as its crossovers, so an opposite signal closes a trade.
+        positions = np.zeros(len(self.data))
+        equity = np.zeros(len(self.data))
+        equity[:self.FIRST_BAR] = self.initial_capital  # Flat during the warm-up
+        capital, records = final_loop(
+            close, arrays['high'], arrays['low'], atr,
+            self.indicators['ema_55'], self.indicators['rsi'],
+            signals == 1, signals == -1, self.FIRST_BAR, float(self.initial_capital),
+            self.risk_per_trade, self.sl_atr_mult, self.tp_atr_mult, self.trail_atr_mult,
+            0.1, 0.0, positions, equity
+        )
         
-        # Close remaining
-        if position != 0:
-            close = self.data['close'].iloc[-1]
-            if position > 0:
-                pnl = (close - entry_price) * position
-            else:
-                pnl = (entry_price - close) * abs(position)
-            capital += pnl
-            
-            if current_trade:
-                current_trade['exit_price'] = close
-                current_trade['exit_reason'] = 'end_of_data'
-                current_trade['pnl'] = pnl
-                self.trades.append(current_trade)
+        self.positions = pd.Series(positions, index=self.data.index)
+        self.capital = pd.Series(equity, index=self.data.index)
+        self.trades = self._trade_list(records, atr)
         
         return self._calculate_metrics(capital)
     
+    @classmethod
+    def sweep(cls,
+              data: pd.DataFrame,
+              risks, sl_mults, tp_mults, trail_mults,
+              initial_capital: float = 10000,
+              indicators: Optional[Dict[str, np.ndarray]] = None,
+              min_trades: int = 0) -> np.ndarray:
+        """
+        Backtest every (risk, SL, TP, trail) combination in one compiled,
+        threaded pass (``final_kernel.param_sweep``).
+        
+        Returns an array of shape ``(len(risks), len(sl_mults), len(tp_mults),
+        len(trail_mults), len(SWEEP_FIELDS))``; cells with ``tp <= sl`` are NaN.
+        With ``min_trades`` set, SL values after one that closed fewer trades
+        (same risk, TP and trail) are pruned and NaN as well.
+        """
+        strategy = cls(data, initial_capital, indicators=indicators)
+        signals = strategy.generate_signals().to_numpy()
+        arrays = to_soa(data, ['close', 'high', 'low'], dtype=np.float64)
+        ind = strategy.indicators
+        return param_sweep(
+            arrays['close'], arrays['high'], arrays['low'], fill_atr(ind['atr'], arrays['close']),
+            ind['ema_55'], ind['rsi'], signals == 1, signals == -1, cls.FIRST_BAR,
+            float(initial_capital), np.asarray(risks, dtype=np.float64),
+            np.asarray(sl_mults, dtype=np.float64), np.asarray(tp_mults, dtype=np.float64),
+            np.asarray(trail_mults, dtype=np.float64), 0.1, 0.0, min_trades
+        )
+    
+    def _trade_list(self, records: np.ndarray, atr: np.ndarray) -> list:
+        """Trade dicts from ``final_loop``'s records, with the initial stop and target."""
+        trades = []
+        for r in records:
+            d = float(r['side'])
+            entry_price = float(r['entry_price'])
+            entry_atr = atr[r['entry_i']]
+            trades.append({
+                'entry_date': self.data.index[r['entry_i']],
+                'entry_price': entry_price,
+                'side': 'long' if d > 0 else 'short',
+                'size': float(r['size']),
+                'stop_loss': float(entry_price - d * entry_atr * self.sl_atr_mult),
+                'take_profit': float(entry_price + d * entry_atr * self.tp_atr_mult),
+                'exit_price': float(r['exit_price']),
+                'exit_reason': self.EXIT_REASONS[r['reason']],
+                'pnl': float(r['pnl'])
+            })
+        return trades
+    
     def _calculate_metrics(self, final_capital: float) -> Dict[str, Any]:
         """Calculate metrics."""
         metrics = {
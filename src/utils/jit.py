@@ -0,0 +1,24 @@
+"""
+Optional Numba JIT support.
+
+Numba is not a hard dependency. When it is missing, ``njit`` returns the
+function unchanged and ``prange`` is plain ``range``, so kernels written
+for Numba still run (slowly) as ordinary Python.
+"""
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for ``numba.njit`` (bare or with options)."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+        return decorator
+
+    prange = range
@@ -0,0 +1,15 @@
+"""
+Struct-of-arrays views of DataFrame columns for use inside bar loops.
+"""
+
+
+def to_soa(df, cols, dtype=None):
+    """
+    Return ``{col: ndarray}`` for the given columns.
+    
+    Indexing ``arrays['close'][i]`` is a single array load, whereas
+    ``df['close'].iloc[i]`` goes through pandas' indexing machinery on
+    every call. Arrays are views where pandas allows it (no copy unless
+    a dtype conversion is needed).
+    """
+    return {col: df[col].to_numpy(dtype=dtype, copy=False) for col in cols}
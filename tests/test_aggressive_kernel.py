@@ -0,0 +1,35 @@
+import pytest
+import numpy as np
+from src.analysis import kernels
+from src.strategy.aggressive_kernel import aggressive_loop, grid_search
+
+@pytest.fixture
+def arrays():
+    """Full-series price and indicator arrays for the aggressive loop"""
+    rng = np.random.default_rng(11)
+    close = rng.normal(0, 10, 400).cumsum() + 1900
+    high = close + rng.uniform(1, 15, 400)
+    low = close - rng.uniform(1, 15, 400)
+    macd, macd_sig = kernels.macd(close)
+    return (close, high, low, kernels.ema(close, 3), kernels.ema(close, 8),
+            kernels.rsi(close, 5), macd, macd_sig, kernels.atr(high, low, close, 10))
+
+def test_grid_search_matches_single_runs(arrays):
+    risks = np.array([0.05, 0.1])
+    sls = np.array([0.8, 1.2])
+    tps = np.array([1.5, 3.0])
+    starts = np.arange(80, 340, 20)
+    grid = grid_search(*arrays, risks, sls, tps, starts, 60, 10000.0)
+
+    assert grid.shape == (2, 2, 2, len(starts), 3)
+    for i, risk in enumerate(risks):
+        for j, sl in enumerate(sls):
+            for k, tp in enumerate(tps):
+                for w, start in enumerate(starts):
+                    window = [a[start:start + 60] for a in arrays]
+                    capital, status, n_trades, _, _ = aggressive_loop(
+                        *window, risk, sl, tp, 10000.0, True, True, True)
+                    profit, passed, trades = grid[i, j, k, w]
+                    assert profit == (capital - 10000.0) / 10000.0 * 100
+                    assert passed == (status == 2 or (status == 0 and capital >= 11000.0))
+                    assert trades == n_trades
@@ -0,0 +1,56 @@
+import os
+import pytest
+import pandas as pd
+import numpy as np
+from src.data.loader import load_ohlcv, read_ohlcv_csv
+
+@pytest.mark.parametrize('freq', ['D', 'h'])
+def test_read_ohlcv_csv_matches_default_engine(tmp_path, freq):
+    rng = np.random.default_rng(3)
+    dates = pd.date_range(start='2023-01-01', periods=50, freq=freq)
+    close = rng.normal(0, 5, 50).cumsum() + 1900
+    df = pd.DataFrame({'open': close, 'high': close + 2, 'low': close - 2,
+                       'close': close, 'volume': rng.integers(100, 1000, 50)},
+                      index=dates)
+    df.index.name = 'datetime'
+    path = tmp_path / 'prices.csv'
+    df.to_csv(path)
+
+    expected = pd.read_csv(path, index_col=0, parse_dates=True)
+    result = read_ohlcv_csv(path)
+
+    pd.testing.assert_frame_equal(result, expected)
+    assert result.index.dtype == 'datetime64[ns]'
+
+def test_load_ohlcv_caches_parquet_until_the_csv_changes(tmp_path):
+    pytest.importorskip('pyarrow')
+    path = tmp_path / 'prices.csv'
+    dates = pd.date_range(start='2023-01-01', periods=30, freq='D')
+    df = pd.DataFrame({'open': 1.0, 'high': 2.0, 'low': 0.5, 'close': np.arange(30.0)},
+                      index=dates)
+    df.index.name = 'datetime'
+    df.to_csv(path)
+
+    first = load_ohlcv(path)
+    assert (tmp_path / 'prices.parquet').exists()
+    pd.testing.assert_frame_equal(first, pd.read_csv(path, index_col=0, parse_dates=True))
+    pd.testing.assert_frame_equal(load_ohlcv(path), first)
+
+    df.iloc[:20].to_csv(path)
+    os.utime(path, (0, first.attrs['source_mtime'] + 10))
+    assert len(load_ohlcv(path)) == 20
+
+def test_load_ohlcv_survives_a_failed_cache_write(tmp_path, monkeypatch):
+    path = tmp_path / 'prices.csv'
+    df = pd.DataFrame({'open': 1.0, 'high': 2.0, 'low': 0.5, 'close': np.arange(5.0)},
+                      index=pd.date_range(start='2023-01-01', periods=5, freq='D'))
+    df.index.name = 'datetime'
+    df.to_csv(path)
+
+    def fail(*args, **kwargs):
+        raise OSError('read-only file system')
+    monkeypatch.setattr(pd.DataFrame, 'to_parquet', fail)
+
+    result = load_ohlcv(path)
+    assert len(result) == 5
+    assert not (tmp_path / 'prices.parquet').exists()
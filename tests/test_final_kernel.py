@@ -0,0 +1,124 @@
+import pytest
+import numpy as np
+from src.strategy.final_kernel import (EXIT_REASONS, SWEEP_FIELDS, TRADE_DTYPE, fill_atr,
+                                       final_loop, param_sweep)
+
+def _run(close, high, low, cross_up, cross_down):
+    n = len(close)
+    positions = np.zeros(n)
+    equity = np.zeros(n)
+    capital, trades = final_loop(close, high, low, np.full(n, 2.0), np.full(n, 90.0),
+                                 np.full(n, 50.0), cross_up, cross_down, 1, 10000.0,
+                                 0.02, 1.5, 3.0, 1.5, 0.15, 0.0, positions, equity)
+    return capital, positions, equity, trades
+
+def test_no_signals_means_no_trades():
+    close = np.full(10, 100.0)
+    no_cross = np.zeros(10, dtype=bool)
+    capital, positions, equity, trades = _run(close, close + 1, close - 1, no_cross, no_cross)
+    assert capital == 10000.0
+    assert len(trades) == 0
+    assert trades.dtype == TRADE_DTYPE
+    assert (positions == 0).all()
+    assert (equity[1:] == 10000.0).all()
+
+def test_long_trade_hits_take_profit():
+    close = np.array([100.0, 100.0, 101.0, 103.0, 104.0])
+    high = close + 0.5
+    high[4] = 107.0  # entry 100 + 3.0 * ATR 2.0 = 106 take profit
+    low = close - 0.5
+    low[4] = 105.0  # stays above the trailing stop at 107 - 1.5 * ATR
+    cross_up = np.array([False, True, False, False, False])
+    no_cross = np.zeros(5, dtype=bool)
+
+    capital, positions, equity, trades = _run(close, high, low, cross_up, no_cross)
+
+    assert len(trades) == 1
+    trade = trades[0]
+    assert EXIT_REASONS[trade['reason']] == 'take_profit'
+    assert trade['side'] == 1
+    assert trade['exit_price'] == pytest.approx(106.0)
+    assert capital == pytest.approx(10000.0 + trade['pnl'])
+    assert positions[4] == 0
+
+def test_fill_atr_replaces_warm_up_values():
+    atr = np.array([np.nan, 0.0, -1.0, 2.5])
+    close = np.array([100.0, 200.0, 300.0, 400.0])
+    assert fill_atr(atr, close).tolist() == [1.0, 2.0, 3.0, 2.5]
+
+def test_ruined_account_stops_trading():
+    close = np.array([100.0, 100.0, 96.0, 100.0, 100.0, 100.0])
+    high = close + 0.5
+    low = close - 0.5
+    cross_up = np.array([False, True, False, False, True, False])
+    no_cross = np.zeros(6, dtype=bool)
+    positions = np.zeros(6)
+    equity = np.zeros(6)
+
+    # The first trade is stopped out at a loss, leaving capital below the
+    # ruin level, so the second signal is never taken
+    capital, trades = final_loop(close, high, low, np.full(6, 2.0), np.full(6, 90.0),
+                                 np.full(6, 50.0), cross_up, no_cross, 1, 10000.0,
+                                 0.02, 1.5, 3.0, 1.5, 0.15, 9999.0, positions, equity)
+
+    assert len(trades) == 1
+    assert EXIT_REASONS[trades[0]['reason']] == 'stop'
+    assert capital < 9999.0
+    assert (positions[2:] == 0).all()
+    assert (equity[2:] == capital).all()
+
+def test_param_sweep_matches_single_runs():
+    rng = np.random.default_rng(3)
+    n = 300
+    close = rng.normal(0, 5, n).cumsum() + 1000
+    high = close + rng.uniform(0.5, 6, n)
+    low = close - rng.uniform(0.5, 6, n)
+    atr = np.full(n, 4.0)
+    trend = np.full(n, 900.0)
+    rsi = np.full(n, 50.0)
+    cross_up = rng.random(n) < 0.05
+    cross_down = ~cross_up & (rng.random(n) < 0.05)
+    risks = np.array([0.01, 0.03])
+    sls = np.array([1.5, 3.0])
+    tps = np.array([3.0])
+    trails = np.array([1.0, 2.0])
+
+    grid = param_sweep(close, high, low, atr, trend, rsi, cross_up, cross_down, 10, 10000.0,
+                       risks, sls, tps, trails, 0.1, 0.0)
+
+    assert grid.shape == (2, 2, 1, 2, len(SWEEP_FIELDS))
+    assert np.isnan(grid[:, 1]).all()  # TP 3.0 <= SL 3.0 is not run
+    for i, risk in enumerate(risks):
+        for m, trail in enumerate(trails):
+            equity = np.zeros(n)
+            equity[:10] = 10000.0
+            capital, trades = final_loop(close, high, low, atr, trend, rsi, cross_up, cross_down,
+                                         10, 10000.0, risk, 1.5, 3.0, trail, 0.1, 0.0,
+                                         np.zeros(n), equity)
+            stats = dict(zip(SWEEP_FIELDS, grid[i, 0, 0, m]))
+            assert stats['capital'] == capital
+            assert stats['trades'] == len(trades)
+            assert stats['wins'] == (trades['pnl'] > 0).sum()
+            peak = np.maximum.accumulate(equity)
+            assert stats['max_dd'] == pytest.approx(((peak - equity) / peak).max())
+
+
+def test_param_sweep_prunes_wider_stops_after_too_few_trades():
+    rng = np.random.default_rng(4)
+    n = 200
+    close = rng.normal(0, 5, n).cumsum() + 1000
+    high = close + rng.uniform(0.5, 6, n)
+    low = close - rng.uniform(0.5, 6, n)
+    cross_up = rng.random(n) < 0.05
+    cross_down = ~cross_up & (rng.random(n) < 0.05)
+    args = (close, high, low, np.full(n, 4.0), np.full(n, 900.0), np.full(n, 50.0),
+            cross_up, cross_down, 10, 10000.0, np.array([0.02]), np.array([1.0, 1.5, 2.0]),
+            np.array([3.0, 4.0]), np.array([1.5]), 0.1, 0.0)
+
+    full = param_sweep(*args)
+    pruned = param_sweep(*args, 10 ** 6)
+
+    # Every group falls short at the first SL, so only that one is run
+    np.testing.assert_array_equal(pruned[:, 0], full[:, 0])
+    assert np.isnan(pruned[:, 1:]).all()
+    assert not np.isnan(full[:, 1:]).any()
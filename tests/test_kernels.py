@@ -0,0 +1,59 @@
+import pytest
+import pandas as pd
+import numpy as np
+import ta
+from src.analysis import kernels
+
+@pytest.fixture
+def sample_data():
+    """Create sample OHLC data for testing"""
+    rng = np.random.default_rng(7)
+    close = rng.normal(0, 5, 300).cumsum() + 1900
+    high = close + rng.uniform(1, 10, 300)
+    low = close - rng.uniform(1, 10, 300)
+    dates = pd.date_range(start='2023-01-01', periods=300, freq='D')
+    return pd.DataFrame({'high': high, 'low': low, 'close': close}, index=dates)
+
+@pytest.mark.parametrize('window', [3, 8, 21, 55])
+def test_ema_matches_ta(sample_data, window):
+    expected = ta.trend.ema_indicator(sample_data['close'], window=window).to_numpy()
+    result = kernels.ema(sample_data['close'].to_numpy(), window)
+    np.testing.assert_allclose(result, expected, equal_nan=True)
+
+def test_ema_skips_leading_nans(sample_data):
+    series = sample_data['close'].copy()
+    series.iloc[:10] = np.nan
+    expected = series.ewm(span=9, adjust=False, min_periods=9).mean().to_numpy()
+    result = kernels.ema(series.to_numpy(), 9)
+    np.testing.assert_allclose(result, expected, equal_nan=True)
+
+@pytest.mark.parametrize('window', [10, 14])
+def test_atr_matches_ta(sample_data, window):
+    df = sample_data
+    expected = ta.volatility.average_true_range(df['high'], df['low'], df['close'], window=window).to_numpy()
+    result = kernels.atr(df['high'].to_numpy(), df['low'].to_numpy(), df['close'].to_numpy(), window)
+    np.testing.assert_allclose(result, expected)
+
+@pytest.mark.parametrize('window', [5, 14])
+def test_rsi_matches_ta(sample_data, window):
+    expected = ta.momentum.rsi(sample_data['close'], window=window).to_numpy()
+    result = kernels.rsi(sample_data['close'].to_numpy(), window)
+    np.testing.assert_allclose(result, expected, equal_nan=True)
+
+def test_macd_matches_ta(sample_data):
+    indicator = ta.trend.MACD(sample_data['close'])
+    line, signal = kernels.macd(sample_data['close'].to_numpy())
+    np.testing.assert_allclose(line, indicator.macd().to_numpy(), equal_nan=True)
+    np.testing.assert_allclose(signal, indicator.macd_signal().to_numpy(), equal_nan=True)
+
+def test_crossovers_match_shift_form(sample_data):
+    fast = ta.trend.ema_indicator(sample_data['close'], window=5)
+    slow = ta.trend.ema_indicator(sample_data['close'], window=21)
+    expected_up = (fast > slow) & (fast.shift(1) <= slow.shift(1))
+    expected_down = (fast < slow) & (fast.shift(1) >= slow.shift(1))
+
+    cross_up, cross_down = kernels.crossovers(fast.to_numpy(), slow.to_numpy())
+
+    assert cross_up.tolist() == expected_up.tolist()
+    assert cross_down.tolist() == expected_down.tolist()
+    assert cross_up.any() and cross_down.any()
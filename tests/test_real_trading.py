@@ -0,0 +1,41 @@
+import pytest
+import pandas as pd
+import numpy as np
+from src.strategy.real_trading import (
+    BrokerParams, precompute_features, simulate_capital_sweep, simulate_real_trading
+)
+
+@pytest.fixture
+def sample_data():
+    """Create sample OHLC data for testing"""
+    rng = np.random.default_rng(5)
+    close = rng.normal(0, 8, 600).cumsum() + 1900
+    dates = pd.date_range(start='2022-01-01', periods=600, freq='D')
+    return pd.DataFrame({'open': close,
+                         'high': close + rng.uniform(1, 15, 600),
+                         'low': close - rng.uniform(1, 15, 600),
+                         'close': close}, index=dates)
+
+def test_trades_account_for_every_dollar(sample_data):
+    result = simulate_real_trading(sample_data, 10000)
+    trades = result['trades']
+
+    assert len(trades) > 0
+    assert list(trades.columns) == ['side', 'entry', 'exit', 'size_oz',
+                                    'gross_pnl', 'costs', 'net_pnl', 'reason']
+    # Each trade pays the fill cost on entry and again on exit
+    total_costs = 2 * len(trades) * (0.30 + 0.07)
+    assert result['final'] == pytest.approx(10000 + trades['gross_pnl'].sum() - total_costs)
+
+def test_capital_sweep_matches_single_runs(sample_data):
+    broker = BrokerParams(spread_cost=0.35, commission=0.0)
+    features = precompute_features(sample_data)
+    capitals = [100, 1000, 10000]
+
+    sweep = simulate_capital_sweep(sample_data, capitals, broker, features=features)
+
+    for capital, (final, n_trades, skipped, rejected) in zip(capitals, sweep):
+        r = simulate_real_trading(sample_data, capital, broker, features=features)
+        assert final == r['final']
+        assert n_trades == len(r['trades'])
+        assert (skipped, rejected) == (r['skipped'], r['margin_rejected'])
@@ -0,0 +1,67 @@
+import pytest
+import numpy as np
+from src.strategy.real_trading_kernel import (
+    EXIT_REASONS, capital_sweep, long_signals, real_trading_loop
+)
+
+def _run(close, high, low, cross_up, initial_capital=10000.0):
+    n = len(close)
+    long_sig = long_signals(cross_up, close, np.full(n, 90.0), np.full(n, 50.0))
+    return real_trading_loop(close, high, low, np.full(n, 2.0), long_sig, 1,
+                             initial_capital, 0.30, 0.07, 0.01, 100)
+
+def test_take_profit_trade_pays_costs():
+    close = np.array([100.0, 100.0, 101.0, 103.0, 104.0])
+    high = close + 0.5
+    high[4] = 107.0  # entry 100 + 3.0 * ATR 2.0 = 106 take profit
+    low = close - 0.5
+    low[4] = 105.0
+    cross_up = np.array([False, True, False, False, False])
+
+    capital, skipped, rejected, trades = _run(close, high, low, cross_up)
+    entries, exits, sizes, gross, costs, net, reasons = trades
+
+    assert len(reasons) == 1
+    assert EXIT_REASONS[reasons[0]] == 'take_profit'
+    assert exits[0] == pytest.approx(106.0)
+    # 2% of 10000 risked over a 3.0 stop distance
+    assert sizes[0] == pytest.approx(66.67)
+    assert net[0] == pytest.approx(gross[0] - 0.37)
+    assert capital == pytest.approx(10000.0 - 0.37 + net[0])
+    assert (skipped, rejected) == (0, 0)
+
+def test_tiny_account_is_margin_rejected():
+    close = np.full(4, 100.0)
+    cross_up = np.array([False, True, False, False])
+
+    capital, skipped, rejected, trades = _run(close, close + 1, close - 1, cross_up,
+                                              initial_capital=0.30)
+
+    assert rejected == 1
+    assert len(trades[0]) == 0
+    assert capital == 0.30
+
+def test_long_signals_need_trend_and_rsi_filters():
+    cross_up = np.array([True, True, True, False])
+    close = np.array([100.0, 100.0, 100.0, 100.0])
+    ema_55 = np.array([90.0, 110.0, 90.0, 90.0])
+    rsi = np.array([50.0, 50.0, 75.0, np.nan])
+
+    assert long_signals(cross_up, close, ema_55, rsi).tolist() == [True, False, False, False]
+
+def test_capital_sweep_matches_single_runs():
+    rng = np.random.default_rng(3)
+    close = rng.normal(0, 8, 500).cumsum() + 1900
+    high = close + rng.uniform(1, 15, 500)
+    low = close - rng.uniform(1, 15, 500)
+    atr = np.full(500, 12.0)
+    long_sig = rng.random(500) < 0.05
+    capitals = np.array([0.5, 100.0, 1000.0, 10000.0])
+
+    sweep = capital_sweep(close, high, low, atr, long_sig, 10, capitals, 0.30, 0.07, 0.01, 100)
+
+    assert sweep.shape == (4, 4)
+    for k, capital in enumerate(capitals):
+        final, skipped, rejected, trades = real_trading_loop(
+            close, high, low, atr, long_sig, 10, capital, 0.30, 0.07, 0.01, 100)
+        assert sweep[k].tolist() == [final, len(trades[0]), skipped, rejected]
@@ -0,0 +1,28 @@
+import os
+import pytest
+import pandas as pd
+import numpy as np
+from src.analysis.signal_indicators import INDICATOR_COLUMNS, load_signal_indicators
+
+pytest.importorskip('pyarrow')
+
+def _write_prices(path, periods, seed):
+    rng = np.random.default_rng(seed)
+    close = rng.normal(0, 5, periods).cumsum() + 1900
+    df = pd.DataFrame({'open': close, 'high': close + 2, 'low': close - 2, 'close': close},
+                      index=pd.date_range(start='2023-01-01', periods=periods, freq='D'))
+    df.to_csv(path)
+
+def test_indicators_are_cached_until_the_csv_changes(tmp_path):
+    path = tmp_path / 'prices.csv'
+    _write_prices(path, 100, seed=1)
+
+    first = load_signal_indicators(path)
+    assert set(INDICATOR_COLUMNS) <= set(first.columns)
+    assert (tmp_path / 'prices.indicators.parquet').exists()
+    pd.testing.assert_frame_equal(load_signal_indicators(path), first)
+
+    _write_prices(path, 120, seed=2)
+    os.utime(path, (0, first.attrs['source_mtime'] + 10))
+    rebuilt = load_signal_indicators(path)
+    assert len(rebuilt) == 120
@@ -4,6 +4,7 @@ import numpy as np
 from src.strategy.sma_crossover import SMACrossoverStrategy
 from src.strategy.rsi_mean_reversion import RSIMeanReversionStrategy
 from src.strategy.backtester import Backtester
+from src.strategy.working_strategy import WorkingStrategy
 from datetime import datetime, timedelta
 
 @pytest.fixture
@@ -70,3 +71,19 @@ def test_strategy_signals(sample_data):
     assert isinstance(rsi_signals, pd.Series)
     assert set(sma_signals.unique()).issubset({-1, 0, 1})
     assert set(rsi_signals.unique()).issubset({-1, 0, 1})
+
+    
+def test_working_strategy_precomputed_indicators(sample_data):
+    indicators = WorkingStrategy.precompute_indicators(sample_data)
+    
+    fresh = WorkingStrategy(sample_data, sl_atr_mult=1.5, tp_atr_mult=3.0).backtest()
+    shared = WorkingStrategy(sample_data, sl_atr_mult=1.5, tp_atr_mult=3.0,
+                             indicators=indicators).backtest()
+    
+    assert shared == fresh
+    
+def test_working_strategy_does_not_modify_data(sample_data):
+    original = sample_data.copy()
+    WorkingStrategy(sample_data).backtest()
+    
+    pd.testing.assert_frame_equal(sample_data, original)